@@ -34,7 +34,7 @@
 
     # ADD THIS SECTION - External Dependencies
     'external_dependencies': {
-        'python': ['pyodbc', 'cryptography'],
+        'python': ['pymssql', 'cryptography'],
     },
 
     # always loaded
@@ -43,6 +43,9 @@
         'security/security.xml',
         'security/ir.model.access.csv',
 
+        # Data
+        'data/ir_cron_data.xml',
+
         # Views
         'views/sql_import_connection_views.xml',
         'views/sql_import_mapping_views.xml',
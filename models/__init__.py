@@ -3,5 +3,6 @@
 from . import sql_import_connection
 from . import sql_import_mapping
 from . import sql_import_job
-from . import password_mixin
+from . import sql_import_job_log
+from . import sql_import_checksum_cache
 from . import sql_legacy_table
\ No newline at end of file
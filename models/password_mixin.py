@@ -1,41 +1,63 @@
 # models/password_mixin.py
-from odoo import models, fields, api
 import base64
+import functools
+import hashlib
+import threading
 from cryptography.fernet import Fernet
-from cryptography.hazmat.primitives import hashes
-from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
 import logging
 
 _logger = logging.getLogger(__name__)
 
+# Fernet tokens always start with the base64 encoding of version byte 0x80
+_FERNET_TOKEN_PREFIX = b'gAAAAA'
 
-class PasswordMixin(models.AbstractModel):
-    """Simple mixin for encrypted password storage"""
-    _name = 'dat.password.mixin'
-    _description = 'Password Encryption Mixin'
+# Secret and salt are constants, so the key and the Fernet instance are
+# derived once per worker and shared by every call.
+_FERNET = None
+_FERNET_LOCK = threading.Lock()
 
-    @api.model
-    def _get_encryption_key(self):
+
+@functools.lru_cache(maxsize=1)
+def _derive_encryption_key():
+    """Generate a simple encryption key"""
+    # Simple key generation - same for all instances
+    # Same parameters as before so existing stored passwords stay readable
+    secret = "odoo_password_encryption_key_v1"
+    key = hashlib.pbkdf2_hmac('sha256', secret.encode(), b'simple_salt_12345', 100000, dklen=32)
+    return base64.urlsafe_b64encode(key)
+
+
+def _get_fernet():
+    """Return the shared Fernet instance, building it on first use"""
+    global _FERNET
+    if _FERNET is None:
+        with _FERNET_LOCK:
+            if _FERNET is None:
+                _FERNET = Fernet(_derive_encryption_key())
+    return _FERNET
+
+
+class PasswordMixin:
+    """Simple helpers for encrypted password storage
+
+    Plain Python class: the helpers use no record state, so they are not
+    registered as an Odoo model and are called directly on the class.
+    """
+
+    @staticmethod
+    def _get_encryption_key():
         """Generate a simple encryption key"""
-        # Simple key generation - same for all instances
-        secret = "odoo_password_encryption_key_v1"
-        kdf = PBKDF2HMAC(
-            algorithm=hashes.SHA256(),
-            length=32,
-            salt=b'simple_salt_12345',
-            iterations=100000,
-        )
-        key = base64.urlsafe_b64encode(kdf.derive(secret.encode()))
-        return key
-
-    def encrypt_password(self, password):
+        return _derive_encryption_key()
+
+    @staticmethod
+    def encrypt_password(password):
         """Encrypt a password"""
         if not password:
             return False
 
         # Handle case where password might be boolean (the original error)
         if isinstance(password, bool):
-            _logger.warning(f"Password field received boolean value: {password}")
+            _logger.warning("Password field received boolean value: %s", password)
             return False
 
         # Ensure password is string
@@ -43,25 +65,27 @@ class PasswordMixin(models.AbstractModel):
             password = str(password)
 
         try:
-            fernet = Fernet(self._get_encryption_key())
-            encrypted_bytes = fernet.encrypt(password.encode('utf-8'))
-            # Convert to base64 for proper storage in Binary field
-            return base64.b64encode(encrypted_bytes)
+            # Fernet tokens are already URL-safe base64 text
+            return _get_fernet().encrypt(password.encode('utf-8'))
         except Exception as e:
-            _logger.error(f"Password encryption failed: {e}")
+            _logger.error("Password encryption failed: %s", e)
             return False
 
-    def decrypt_password(self, encrypted_password):
+    @staticmethod
+    def decrypt_password(encrypted_password):
         """Decrypt a password"""
         if not encrypted_password:
             return None
 
+        if isinstance(encrypted_password, str):
+            encrypted_password = encrypted_password.encode('ascii')
+
         try:
-            fernet = Fernet(self._get_encryption_key())
-            # Decode from base64 first
-            encrypted_bytes = base64.b64decode(encrypted_password)
-            decrypted_bytes = fernet.decrypt(encrypted_bytes)
+            if not encrypted_password.startswith(_FERNET_TOKEN_PREFIX):
+                # Passwords stored before tokens were saved as-is carry an extra base64 layer
+                encrypted_password = base64.b64decode(encrypted_password)
+            decrypted_bytes = _get_fernet().decrypt(encrypted_password)
             return decrypted_bytes.decode('utf-8')
         except Exception as e:
-            _logger.error(f"Password decryption failed: {e}")
-            return None
\ No newline at end of file
+            _logger.error("Password decryption failed: %s", e)
+            return None
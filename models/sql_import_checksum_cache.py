@@ -0,0 +1,21 @@
+from odoo import models, fields
+
+
+class SqlImportChecksumCache(models.Model):
+    _name = 'dat.sql.import.checksum.cache'
+    _description = 'SQL Import Target Checksum Cache'
+    _log_access = False
+
+    job_id = fields.Many2one('dat.sql.import.job', string='Job', required=True, index=True, ondelete='cascade')
+    signature = fields.Char(string='Mapping Signature', required=True,
+                            help='SHA-256 of the mapping and its field mappings the digest was computed with')
+    res_id = fields.Integer(string='Record ID', required=True)
+    row_key = fields.Char(string='Legacy ID')
+    digest = fields.Binary(string='Digest', attachment=False)
+    record_write_date = fields.Datetime(string='Record Last Updated')
+    computed_at = fields.Datetime(string='Computed At', default=fields.Datetime.now)
+
+    _sql_constraints = [
+        ('job_signature_res_id_uniq', 'unique(job_id, signature, res_id)',
+         'A record can only have one cached digest per job and mapping signature!'),
+    ]
@@ -1,15 +1,75 @@
-from odoo import models, fields, api, _
+from odoo import models, fields, api, tools, _
 from odoo.exceptions import UserError
 
 from .password_mixin import PasswordMixin
 
+from collections import defaultdict, namedtuple
+from contextlib import contextmanager
+from decimal import Decimal
 import logging
+import queue
+import threading
+import time
 import pymssql
 
 _logger = logging.getLogger(__name__)
 
+# Idle pymssql connections, keyed by (record id, server, port, database, username).
+# The record id keeps a record from borrowing connections another record's
+# password opened.
+# Each entry is a queue of (connection, released_at) tuples.
+_POOL = {}
+_POOL_LOCK = threading.Lock()
+_POOL_SIZE = 4
+_POOL_IDLE_TIMEOUT = 300  # seconds
+_POOL_PING_AFTER = 30  # seconds idle before a pooled connection is checked
 
-class SqlImportConnection(models.Model, PasswordMixin):
+# Fields that end up in the pymssql.connect() call
+_CONNECT_FIELDS = ('server', 'port', 'database', 'username', 'timeout')
+
+# Source table reference, built straight from the pymssql row tuples
+# (as_dict=False) returned by the INFORMATION_SCHEMA.TABLES query
+Table = namedtuple('Table', 'schema table full_name')
+
+# Source column, one row of the INFORMATION_SCHEMA.COLUMNS query
+Column = namedtuple('Column', 'name type nullable length')
+
+
+def _get_pool(key):
+    """Return the idle-connection queue for a pool key"""
+    with _POOL_LOCK:
+        pool = _POOL.get(key)
+        if pool is None:
+            pool = _POOL[key] = queue.Queue(maxsize=_POOL_SIZE)
+        return pool
+
+
+def _quote_identifier(name):
+    """Quote a SQL Server identifier with square brackets"""
+    return '[%s]' % name.replace(']', ']]')
+
+
+def _quote_literal(value):
+    """SQL Server literal of an integer, decimal or string value
+
+    :raise TypeError: for the other types
+    """
+    if isinstance(value, (int, Decimal)) and not isinstance(value, bool):
+        return str(value)
+    if isinstance(value, str):
+        return "N'%s'" % value.replace("'", "''")
+    raise TypeError(f'no SQL literal for {type(value).__name__} values')
+
+
+def _close_quietly(conn):
+    """Close a connection, ignoring errors from already broken ones"""
+    try:
+        conn.close()
+    except Exception:
+        pass
+
+
+class SqlImportConnection(models.Model):
     _name = 'dat.sql.import.connection'
     _description = 'SQL Server Connection Configuration'
     _rec_name = 'name'
@@ -19,11 +79,11 @@ class SqlImportConnection(models.Model, PasswordMixin):
     port = fields.Integer(string='Port', default=1433)
     database = fields.Char(string='Database', required=True)
     username = fields.Char(string='Username', required=True)
-    password_encrypted = fields.Text(string='Encrypted Password', readonly=True)
+    password_encrypted = fields.Char(string='Encrypted Password', readonly=True)
+    # Write-only: create()/write() encrypt it into password_encrypted and drop it
     password = fields.Char(
         string='Password',
-        compute='_compute_password',
-        inverse='_inverse_password',
+        store=False,
         help='Enter password to update stored password'
     )
 
@@ -42,15 +102,30 @@ class SqlImportConnection(models.Model, PasswordMixin):
     error_message = fields.Text(string='Error Message', readonly=True)
 
 
+    @tools.ormcache('self.id', 'self.password_encrypted')
     def _get_password(self):
-        """Get decrypted password"""
+        """Get decrypted password
+
+        Cached per record and ciphertext: a new password gives a new cache
+        key, so no explicit invalidation is needed.
+        """
         if self.password_encrypted:
-            # Convert string back to bytes for decryption
-            encrypted_bytes = self.password_encrypted.encode('utf-8') if isinstance(self.password_encrypted,
-                                                                                    str) else self.password_encrypted
-            return self.decrypt_password(encrypted_bytes)
+            return PasswordMixin.decrypt_password(self.password_encrypted.encode('ascii'))
         return None
 
+    @tools.ormcache('self.id')
+    def _connect_kwargs(self):
+        """pymssql.connect() arguments, except the password"""
+        return {
+            'server': self.server,
+            'port': self.port,
+            'user': self.username,
+            'database': self.database,
+            'timeout': self.timeout,
+            'charset': 'utf8',
+            'as_dict': False,  # Return tuples instead of dictionaries for consistency
+        }
+
     def _get_pymssql_connection(self):
         """Create connection using pymssql"""
         try:
@@ -60,40 +135,101 @@ class SqlImportConnection(models.Model, PasswordMixin):
             if not password:
                 raise UserError(_('Password is required for connection'))
 
-            return pymssql.connect(
-                server=self.server,
-                port=self.port,
-                user=self.username,
-                password=password,  # Use decrypted password
-                database=self.database,
-                timeout=self.timeout,
-                charset='utf8',
-                as_dict=False  # Return tuples instead of dictionaries for consistency
-            )
+            return pymssql.connect(password=password, **self._connect_kwargs())
         except Exception as e:
-            _logger.error(f"pymssql connection failed: {e}")
+            _logger.error("pymssql connection failed: %s", e)
             raise UserError(_('Failed to connect using pymssql: %s') % str(e))
 
+    def _pool_key(self):
+        return (self.id, self.server, self.port, self.database, self.username)
+
+    def _acquire_connection(self):
+        """Take a live connection from the pool, or open a new one"""
+        pool = _get_pool(self._pool_key())
+        while True:
+            try:
+                conn, released_at = pool.get_nowait()
+            except queue.Empty:
+                return self._get_pymssql_connection()
+
+            idle = time.monotonic() - released_at
+            if idle > _POOL_IDLE_TIMEOUT:
+                _close_quietly(conn)
+                continue
+            if idle < _POOL_PING_AFTER:
+                # Given back moments ago, by the previous step of the same
+                # wizard or form: skip the round-trip
+                return conn
+
+            try:
+                cursor = conn.cursor()
+                cursor.execute("SELECT 1")
+                cursor.fetchone()
+                cursor.close()
+            except Exception:
+                _close_quietly(conn)
+                continue
+            return conn
+
+    def _release_connection(self, conn):
+        """Give a connection back to the pool, closing it if the pool is full"""
+        try:
+            conn.rollback()
+            _get_pool(self._pool_key()).put_nowait((conn, time.monotonic()))
+        except Exception:
+            _close_quietly(conn)
+
+    def _discard_pooled_connections(self):
+        """Close the idle connections opened with this record's settings"""
+        for record in self:
+            pool = _get_pool(record._pool_key())
+            while True:
+                try:
+                    conn, _released_at = pool.get_nowait()
+                except queue.Empty:
+                    break
+                _close_quietly(conn)
+
+    def _iter_rows(self, cursor, batch=10000):
+        """Yield the cursor result set in batches instead of one fetchall()"""
+        while True:
+            rows = cursor.fetchmany(batch)
+            if not rows:
+                break
+            yield rows
+
+    @contextmanager
+    def _checkout(self, fresh=False):
+        """Borrow a pooled connection for the duration of a with block
+
+        :param fresh: open a new connection instead of taking an idle one,
+            it still goes to the pool on exit
+        """
+        conn = self._get_pymssql_connection() if fresh else self._acquire_connection()
+        try:
+            yield conn
+        except BaseException:
+            # The connection state is unknown after a failure or an abandoned
+            # result set, don't reuse it
+            _close_quietly(conn)
+            raise
+        else:
+            self._release_connection(conn)
+
     def test_connection(self):
         """Test SQL Server connection"""
         self.ensure_one()
 
         try:
-            # create connection
-            conn = self._get_pymssql_connection()
+            # A new login checks the current password, a pooled one would not
+            with self._checkout(fresh=True) as conn:
+                # Test the connection
+                cursor = conn.cursor()
+                cursor.execute("SELECT @@VERSION")
+                version = cursor.fetchone()[0]
+                cursor.close()
 
-            # Test the connection
-            cursor = conn.cursor()
-            cursor.execute("SELECT @@VERSION")
-            version = cursor.fetchone()[0]
-            cursor.close()
-            conn.close()
-
-            self.write({
-                'state': 'connected',
-                'last_connection_date': fields.Datetime.now(),
-                'error_message': False
-            })
+            self.write(self._connected_vals())
 
             return {
                 'type': 'ir.actions.act_window',
@@ -113,220 +249,183 @@ class SqlImportConnection(models.Model, PasswordMixin):
             })
             raise UserError(_('Connection failed: %s') % str(e))
 
-    def get_connection(self):
-        """Return a SQL Server connection object"""
-        self.ensure_one()
-
-        if self.state != 'connected':
-            self.test_connection()
+    def _connected_vals(self):
+        return {
+            'state': 'connected',
+            'last_connection_date': fields.Datetime.now(),
+            'error_message': False
+        }
 
-        return self._get_pymssql_connection()
+    @contextmanager
+    def get_connection(self):
+        """Borrow a SQL Server connection for the duration of a with block
 
-    def fetch_tables(self):
-        """Fetch all tables from SQL Server database"""
+        The connection comes from the pool and is given back to it on exit.
+        """
         self.ensure_one()
-        tables = []
-
-        # Use get_connection() which now properly returns a connection
-        conn = self.get_connection()
-        try:
-            cursor = conn.cursor()
-            cursor.execute("""
-                           SELECT TABLE_SCHEMA, TABLE_NAME
-                           FROM INFORMATION_SCHEMA.TABLES
-                           WHERE TABLE_TYPE = 'BASE TABLE'
-                           ORDER BY TABLE_SCHEMA, TABLE_NAME
-                           """)
-
-            for row in cursor.fetchall():
-                # Handle both pymssql and pyodbc result formats
-                if hasattr(row, 'TABLE_SCHEMA'):
-                    # pyodbc returns named results
-                    schema = row.TABLE_SCHEMA
-                    table = row.TABLE_NAME
-                else:
-                    # pymssql returns tuples
-                    schema = row[0]
-                    table = row[1]
-
-                tables.append({
-                    'schema': schema,
-                    'table': table,
-                    'full_name': f"{schema}.{table}"
-                })
-
-            self.write({
-                'available_tables': self._format_tables_for_display(tables)
-            })
 
-            return {
-                'type': 'ir.actions.client',
-                'tag': 'display_notification',
-                'params': {
-                    'title': _('Tables Retrieved'),
-                    'message': _('Found %d tables in database %s') % (len(tables), self.database),
-                    'type': 'success',
-                }
-            }
-        finally:
-            conn.close()
+        with self._checkout() as conn:
+            if self.state != 'connected':
+                # Validate the connection we hand out instead of opening a test one
+                try:
+                    cursor = conn.cursor()
+                    cursor.execute("SELECT 1")
+                    cursor.fetchone()
+                    cursor.close()
+                except Exception as e:
+                    self.write({'error_message': str(e)})
+                    raise UserError(_('Connection failed: %s') % str(e))
+                self.write(self._connected_vals())
+
+            yield conn
 
     def fetch_tables(self):
         """Fetch all tables from SQL Server database"""
         self.ensure_one()
         tables = []
 
-        # Use get_connection() which now properly returns a connection
-        conn = self.get_connection()
-        try:
+        with self._checkout() as conn:
             cursor = conn.cursor()
             cursor.execute("""
-                           SELECT TABLE_SCHEMA, TABLE_NAME
+                           SELECT TABLE_SCHEMA, TABLE_NAME, TABLE_SCHEMA + '.' + TABLE_NAME AS FULL_NAME
                            FROM INFORMATION_SCHEMA.TABLES
                            WHERE TABLE_TYPE = 'BASE TABLE'
                            ORDER BY TABLE_SCHEMA, TABLE_NAME
                            """)
 
-            for row in cursor.fetchall():
-                # Handle both pymssql and pyodbc result formats
-                if hasattr(row, 'TABLE_SCHEMA'):
-                    # pyodbc returns named results
-                    schema = row.TABLE_SCHEMA
-                    table = row.TABLE_NAME
-                else:
-                    # pymssql returns tuples
-                    schema = row[0]
-                    table = row[1]
-
-                tables.append({
-                    'schema': schema,
-                    'table': table,
-                    'full_name': f"{schema}.{table}"
-                })
-
-            # STORE THE TABLES IN A FIELD FOR DISPLAY
-            self.write({
-                'available_tables': self._format_tables_for_display(tables)
-            })
+            for batch in self._iter_rows(cursor):
+                tables.extend(map(Table._make, batch))
 
-            return {
-                'type': 'ir.actions.act_window',
-                'res_model': 'dat.sql.import.connection',
-                'res_id': self.id,
-                'view_mode': 'form',
-                'target': 'current',
-                'context': {
-                    'show_tables_message': True,
-                    'tables_message': f'Found {len(tables)} tables in database {self.database}'
-                }
+        # STORE THE TABLES IN A FIELD FOR DISPLAY
+        vals = {'available_tables': self._format_tables_for_display(tables)}
+        if self.state != 'connected':
+            # The query above already proved the connection works
+            vals.update(self._connected_vals())
+        self.write(vals)
+
+        return {
+            'type': 'ir.actions.act_window',
+            'res_model': 'dat.sql.import.connection',
+            'res_id': self.id,
+            'view_mode': 'form',
+            'target': 'current',
+            'context': {
+                'show_tables_message': True,
+                'tables_message': f'Found {len(tables)} tables in database {self.database}'
             }
-        finally:
-            # Always close the connection
-            conn.close()
+        }
 
     def _format_tables_for_display(self, tables):
         """Format tables list for display"""
         if not tables:
             return "No tables found"
 
-        formatted = f"Found {len(tables)} tables:\n\n"
-
         # Group by schema
-        schemas = {}
+        schemas = defaultdict(list)
         for table in tables:
-            schema = table['schema']
-            if schema not in schemas:
-                schemas[schema] = []
-            schemas[schema].append(table['table'])
+            schemas[table.schema].append(table.table)
 
         # Format by schema
+        parts = [f"Found {len(tables)} tables:\n"]
         for schema, table_list in schemas.items():
-            formatted += f"Schema: {schema}\n"
-            for table in sorted(table_list):
-                formatted += f"  • {table}\n"
-            formatted += "\n"
+            parts.append(f"Schema: {schema}")
+            parts.extend(f"  • {table}" for table in sorted(table_list))
+            parts.append("")
 
-        return formatted
+        return "\n".join(parts)
 
     @api.model_create_multi
     def create(self, vals_list):
         """Handle password encryption on create"""
         for vals in vals_list:
-            if 'password' in vals and vals['password']:
-                # Encrypt password using mixin
-                encrypted = self.encrypt_password(vals['password'])
-                if encrypted:
-                    # Convert bytes to string for Text field storage
-                    vals['password_encrypted'] = encrypted.decode('utf-8') if isinstance(encrypted,
-                                                                                         bytes) else encrypted
-                del vals['password']  # Don't store plain text
+            password = vals.pop('password', None)  # Don't store plain text
+            # The helper reuses one Fernet instance for the whole batch
+            encrypted = PasswordMixin.encrypt_password(password)
+            if encrypted:
+                vals['password_encrypted'] = encrypted.decode('ascii')
         return super().create(vals_list)
 
     def write(self, vals):
         """Handle password encryption on write"""
+        if any(key in vals for key in _CONNECT_FIELDS + ('password',)):
+            # Pooled connections were opened with the old settings
+            self._discard_pooled_connections()
+        if any(key in vals for key in _CONNECT_FIELDS):
+            self.env.registry.clear_cache()
+
         if 'password' in vals and vals['password']:
-            # Encrypt new password using mixin
-            encrypted = self.encrypt_password(vals['password'])
+            # Encrypt new password
+            encrypted = PasswordMixin.encrypt_password(vals['password'])
             if encrypted:
-                # Convert bytes to string for Text field storage
-                vals['password_encrypted'] = encrypted.decode('utf-8') if isinstance(encrypted, bytes) else encrypted
+                vals['password_encrypted'] = encrypted.decode('ascii')
                 vals['state'] = 'draft'  # Reset state when password changes
             del vals['password']  # Don't store plain text
         return super().write(vals)
 
-    @api.depends('password_encrypted')
-    def _compute_password(self):
-        for record in self:
-            # Show placeholder if password is stored, empty if not
-            if record.password_encrypted:
-                record.password = '••••••••'  # Password placeholder
-            else:
-                record.password = ''
-
-    def _inverse_password(self):
-        """Inverse method for password field"""
-        for record in self:
-            if record.password and record.password != '••••••••':
-                # Store the actual password value for processing in write()
-                # The write method will handle encryption
-                pass  # Let write() handle the encryption
+    @tools.ormcache('self.id', 'schema', 'table')
+    def _get_table_columns(self, schema, table):
+        """Columns of a source table, as a tuple of Column
+
+        Cached: INFORMATION_SCHEMA queries are slow on SQL Server. The cache
+        is cleared when the tables of a connection are refreshed.
+        """
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                           SELECT COLUMN_NAME, DATA_TYPE, IS_NULLABLE, CHARACTER_MAXIMUM_LENGTH
+                           FROM INFORMATION_SCHEMA.COLUMNS
+                           WHERE TABLE_SCHEMA = %s
+                             AND TABLE_NAME = %s
+                           ORDER BY ORDINAL_POSITION
+                           """, (schema, table))
+            return tuple(Column(name, data_type, nullable == 'YES', length)
+                         for name, data_type, nullable, length in cursor.fetchall())
+
+    def _fetch_columns_by_table(self):
+        """Columns of every base table, in one query
+
+        :return: {(schema, table): [Column, ...]}
+        """
+        self.ensure_one()
+        columns = defaultdict(list)
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                           SELECT c.TABLE_SCHEMA, c.TABLE_NAME, c.COLUMN_NAME, c.DATA_TYPE,
+                                  c.IS_NULLABLE, c.CHARACTER_MAXIMUM_LENGTH
+                           FROM INFORMATION_SCHEMA.COLUMNS c
+                           JOIN INFORMATION_SCHEMA.TABLES t
+                             ON t.TABLE_SCHEMA = c.TABLE_SCHEMA AND t.TABLE_NAME = c.TABLE_NAME
+                           WHERE t.TABLE_TYPE = 'BASE TABLE'
+                           ORDER BY c.TABLE_SCHEMA, c.TABLE_NAME, c.ORDINAL_POSITION
+                           """)
+            for batch in self._iter_rows(cursor):
+                for schema, table, name, data_type, nullable, length in batch:
+                    columns[schema, table].append(Column(name, data_type, nullable == 'YES', length))
+        return columns
 
     def _fetch_tables_list(self):
-        """Fetch tables and return as list (for selection fields)"""
+        """Fetch tables and return them as a list of Table tuples"""
         self.ensure_one()
         tables = []
 
         if self.state != 'connected':
             return tables
 
-        conn = self.get_connection()
         try:
-            cursor = conn.cursor()
-            cursor.execute("""
-                           SELECT TABLE_SCHEMA, TABLE_NAME
-                           FROM INFORMATION_SCHEMA.TABLES
-                           WHERE TABLE_TYPE = 'BASE TABLE'
-                           ORDER BY TABLE_SCHEMA, TABLE_NAME
-                           """)
-
-            for row in cursor.fetchall():
-                # Handle both pymssql and pyodbc result formats
-                if hasattr(row, 'TABLE_SCHEMA'):
-                    schema = row.TABLE_SCHEMA
-                    table = row.TABLE_NAME
-                else:
-                    schema = row[0]
-                    table = row[1]
-
-                tables.append({
-                    'schema': schema,
-                    'table': table,
-                    'full_name': f"{schema}.{table}"
-                })
+            with self._checkout() as conn:
+                cursor = conn.cursor()
+                cursor.execute("""
+                               SELECT TABLE_SCHEMA, TABLE_NAME, TABLE_SCHEMA + '.' + TABLE_NAME AS FULL_NAME
+                               FROM INFORMATION_SCHEMA.TABLES
+                               WHERE TABLE_TYPE = 'BASE TABLE'
+                               ORDER BY TABLE_SCHEMA, TABLE_NAME
+                               """)
+
+                for batch in self._iter_rows(cursor):
+                    tables.extend(map(Table._make, batch))
 
             return tables
         except Exception as e:
-            _logger.error(f"Failed to fetch tables list: {e}")
+            _logger.error("Failed to fetch tables list: %s", e)
             return []
-        finally:
-            conn.close()
\ No newline at end of file
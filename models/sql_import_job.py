@@ -1,14 +1,329 @@
 from odoo import models, fields, api, _
+from odoo.tools import SQL, split_every
 from odoo.exceptions import UserError
-import json
+from psycopg2.extras import execute_values
 import logging
 import hashlib
+import io
+import queue
+import threading
+import time
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing, nullcontext
 from datetime import datetime
 from dateutil import parser
+import pymssql
+
+from .sql_import_connection import _quote_identifier, _quote_literal
 
 _logger = logging.getLogger(__name__)
 
 
+# Field transforms applied to each source value, see _compile_mappings()
+def _t_direct(value):
+    return value
+
+
+def _t_bool(value):
+    return False if value is None else bool(value)
+
+
+def _t_int(value):
+    return False if value is None else int(value)  # Odoo uses False for NULL integers
+
+
+def _t_float(value):
+    return False if value is None else float(value)  # Odoo uses False for NULL floats
+
+
+def _t_str(value):
+    if value is None:
+        return False  # Odoo uses False for NULL strings
+    if value == '':
+        return ''  # Preserve empty strings as empty strings
+    return str(value).strip()
+
+
+# strptime() formats tried on the strings that are not ISO 8601, all read
+# month first like dateutil does; the last one that matched is tried first
+_DATE_FORMATS = (
+    '%m/%d/%Y %H:%M:%S',
+    '%m/%d/%Y %H:%M',
+    '%m/%d/%Y',
+    '%b %d %Y %I:%M%p',  # SQL Server CONVERT() style 100
+    '%Y%m%d',
+)
+_last_date_format = [_DATE_FORMATS[0]]
+
+
+@functools.lru_cache(maxsize=4096)
+def _fast_parse_dt(value):
+    """Parse a date/datetime string, trying the ISO formats SQL Server emits first
+
+    Cached: date columns repeat the same values over many rows, and the
+    returned datetime objects are immutable.
+    """
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        pass
+    # The values of a column share their format: keep the one found
+    last_format = _last_date_format[0]
+    for date_format in (last_format, *_DATE_FORMATS):
+        try:
+            result = datetime.strptime(value, date_format)
+        except ValueError:
+            continue
+        if date_format != last_format:
+            _last_date_format[0] = date_format
+        return result
+    return parser.parse(value)
+
+
+def _t_date(value):
+    if not value:
+        return False
+    if isinstance(value, str):
+        return _fast_parse_dt(value).date()
+    return value.date() if hasattr(value, 'date') else value
+
+
+def _t_datetime(value):
+    if not value:
+        return False
+    if isinstance(value, str):
+        return _fast_parse_dt(value)
+    return value
+
+
+# Variants for columns the driver already returns as date/datetime objects
+def _t_native_date(value):
+    if not value:
+        return False
+    return value.date() if isinstance(value, datetime) else value
+
+
+def _t_native_datetime(value):
+    return value or False
+
+
+_NATIVE_DATETIME_TRANSFORMS = {
+    'date': _t_native_date,
+    'datetime': _t_native_datetime,
+}
+
+
+# Value types for which a transform returns the value unchanged
+_NOOP_TYPES = {
+    _t_bool: frozenset({bool}),
+    _t_int: frozenset({int}),
+    _t_float: frozenset({float}),
+    _t_native_datetime: frozenset({datetime}),
+}
+
+
+TRANSFORMS = {
+    'direct': _t_direct,
+    'bool': _t_bool,
+    'int': _t_int,
+    'float': _t_float,
+    'str': _t_str,
+    'date': _t_date,
+    'datetime': _t_datetime,
+}
+
+
+# Verification: every value becomes the same string on both sides, see _normalize_value_for_comparison()
+# None and False (NULL for Odoo) are handled before dispatching
+def _n_bool(value):
+    return '1' if value else '0'
+
+
+def _n_int(value):
+    try:
+        return str(int(value))
+    except (ValueError, TypeError):
+        return 'NULL'
+
+
+def _n_float(value):
+    try:
+        float_val = float(value)
+    except (ValueError, TypeError):
+        return 'NULL'
+    if float_val.is_integer():
+        return str(int(float_val))
+    return format(float_val, '.6f').rstrip('0').rstrip('.')
+
+
+def _n_str(value):
+    return str(value).strip()
+
+
+def _n_date(value):
+    return value.strftime('%Y-%m-%d') if hasattr(value, 'strftime') else str(value)
+
+
+def _n_datetime(value):
+    return value.strftime('%Y-%m-%d %H:%M:%S.%f')[:-3] if hasattr(value, 'strftime') else str(value)
+
+
+def _null_safe(normalize):
+    return lambda value: 'NULL' if value is None or value is False else normalize(value)
+
+
+_n_direct = _null_safe(_n_str)
+
+_NORMALIZERS = {
+    'bool': _null_safe(_n_bool),
+    'int': _null_safe(_n_int),
+    'float': _null_safe(_n_float),
+    'str': _n_direct,
+    'email': _n_direct,
+    'date': _null_safe(_n_date),
+    'datetime': _null_safe(_n_datetime),
+}
+
+# Memory budget of one fetched batch, see _get_batch_size()
+_BATCH_TARGET_BYTES = 32 * 1024 * 1024
+_AVG_COLUMN_BYTES = 64
+_MIN_BATCH_SIZE = 64
+
+# Target fields the verification does not compare
+_VERIFY_SKIPPED_FIELDS = frozenset({'create_uid', 'write_uid', 'create_date', 'write_date', 'display_name'})
+
+# Records of each kind of difference detailed by the verification
+_VERIFY_MAX_EXAMPLES = 100
+
+# Log lines shown in the job form, the full log is in dat.sql.import.job.log
+_LOG_DISPLAY_LINES = 500
+
+_LOG_LEVELS = {
+    'debug': logging.DEBUG,
+    'info': logging.INFO,
+    'warning': logging.WARNING,
+    'error': logging.ERROR,
+}
+
+# Bounds of the batch size tuned by _BatchSizeTuner
+_ADAPTIVE_MIN_BATCH_SIZE = 100
+_ADAPTIVE_MAX_BATCH_SIZE = 10000
+
+
+def _batch_size_budget(column_count):
+    """Largest batch size keeping one batch within _BATCH_TARGET_BYTES"""
+    return max(_MIN_BATCH_SIZE, _BATCH_TARGET_BYTES // (_AVG_COLUMN_BYTES * column_count))
+
+
+class _BatchSizeTuner:
+    """Hill-climb the batch size on the measured import throughput
+
+    Every ``window`` batches the rows/second of the window is compared to
+    the previous one: the size keeps moving by 25% in the same direction
+    while throughput improves, and turns around when it gets worse.
+    """
+    window = 5
+
+    def __init__(self, size, low, high):
+        self.size = size
+        self.low = low
+        self.high = high
+        self.factor = 1.25
+        self.last_throughput = None
+        self._rows = 0
+        self._seconds = 0.0
+        self._batches = 0
+
+    def record(self, rows, seconds):
+        """Account for one written batch and return the size of the next ones"""
+        self._rows += rows
+        self._seconds += seconds
+        self._batches += 1
+        if self._batches < self.window or not self._seconds:
+            return self.size
+
+        throughput = self._rows / self._seconds
+        if self.last_throughput is not None and throughput < self.last_throughput:
+            self.factor = 1 / self.factor
+        self.last_throughput = throughput
+        self.size = int(min(self.high, max(self.low, self.size * self.factor)))
+        self._rows = self._batches = 0
+        self._seconds = 0.0
+        return self.size
+
+
+_PREFETCH_DONE = object()
+
+# Escapes of COPY's text format
+_COPY_ESCAPES = str.maketrans({'\\': '\\\\', '\t': '\\t', '\n': '\\n', '\r': '\\r'})
+
+
+def _copy_text(value):
+    """Format a value for COPY FROM STDIN in text format"""
+    if value is None:
+        return '\\N'
+    if value is True:
+        return 't'
+    if value is False:
+        return 'f'
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        # bytea hex format, its backslash escaped for COPY
+        return '\\\\x' + bytes(value).hex()
+    return str(value).translate(_COPY_ESCAPES)
+
+
+def _row_digest(values):
+    """16 bytes digest of a row of normalized values, see _verify_imported_data()"""
+    return hashlib.blake2b('\x1f'.join(values).encode(), digest_size=16).digest()
+
+
+def _prefetch_batches(cursor, depth=2):
+    """Yield the cursor.fetchmany() batches, fetched ahead by a background thread
+
+    The fetch only uses the SQL Server connection, so it overlaps with the
+    Odoo inserts of the caller. At most ``depth`` batches wait in memory.
+    """
+    batches = queue.Queue(maxsize=depth)
+    stop = threading.Event()
+
+    def put(item):
+        # Give up when the consumer is gone, instead of blocking forever
+        while not stop.is_set():
+            try:
+                batches.put(item, timeout=0.5)
+                return
+            except queue.Full:
+                pass
+
+    def produce():
+        try:
+            while not stop.is_set():
+                rows = cursor.fetchmany()
+                if not rows:
+                    break
+                put(rows)
+        except Exception as e:
+            put(e)
+        finally:
+            put(_PREFETCH_DONE)
+
+    producer = threading.Thread(target=produce, name='data_migrator.prefetch', daemon=True)
+    producer.start()
+    try:
+        while True:
+            item = batches.get()
+            if item is _PREFETCH_DONE:
+                return
+            if isinstance(item, Exception):
+                raise item
+            yield item
+    finally:
+        # The cursor must not be used by two threads: wait for the producer
+        stop.set()
+        producer.join()
+
+
 class SqlImportJob(models.Model):
     _name = 'dat.sql.import.job'
     _description = 'SQL Import Job'
@@ -20,6 +335,7 @@ class SqlImportJob(models.Model):
 
     state = fields.Selection([
         ('draft', 'Draft'),
+        ('queued', 'Queued'),
         ('running', 'Running'),
         ('done', 'Completed'),
         ('error', 'Error'),
@@ -45,11 +361,16 @@ class SqlImportJob(models.Model):
         ('passed', 'Verification Passed'),
         ('failed', 'Verification Failed')
     ], string='Verification Status', default='pending')
+    verification_sample_percent = fields.Float(
+        string='Verification Sample %', default=100.0,
+        help='Below 100, only this share of the source table pages is compared field by field, '
+             'the record counts of both sides are still compared in full')
     checksum_mismatches = fields.Integer(string='Checksum Mismatches', default=0)
     verification_details = fields.Text(string='Verification Details')
 
     # Logging
-    log_entries = fields.Text(string='Import Log')
+    log_ids = fields.One2many('dat.sql.import.job.log', 'job_id', string='Log Lines', copy=False)
+    log_entries = fields.Text(string='Import Log', compute='_compute_log_entries')
     error_message = fields.Text(string='Error Message')
 
     @api.model
@@ -58,11 +379,20 @@ class SqlImportJob(models.Model):
 
     @api.depends('total_records', 'imported_records', 'failed_records')
     def _compute_progress(self):
-        for job in self:
-            if job.total_records:
-                job.progress = ((job.imported_records + job.failed_records) / job.total_records) * 100
-            else:
-                job.progress = 0
+        # Saved jobs: a single read of the counters for the whole recordset
+        saved_jobs = self.filtered('id')
+        for values in saved_jobs.read(['total_records', 'imported_records', 'failed_records']):
+            self.browse(values['id']).progress = self._get_progress(
+                values['total_records'], values['imported_records'], values['failed_records'])
+        # Jobs being edited in a form have nothing to read yet
+        for job in self - saved_jobs:
+            job.progress = self._get_progress(job.total_records, job.imported_records, job.failed_records)
+
+    @api.model
+    def _get_progress(self, total_records, imported_records, failed_records):
+        if total_records:
+            return ((imported_records + failed_records) / total_records) * 100
+        return 0
 
     @api.depends('start_date', 'end_date')
     def _compute_duration(self):
@@ -73,30 +403,87 @@ class SqlImportJob(models.Model):
             else:
                 job.duration = 0
 
+    def _compute_log_entries(self):
+        # Only the tail of the log: long imports write a line per batch
+        log_model = self.env['dat.sql.import.job.log']
+        for job in self:
+            lines = log_model.search([('job_id', '=', job._origin.id)], order='id desc', limit=_LOG_DISPLAY_LINES)
+            job.log_entries = '\n'.join(line._format_line() for line in reversed(lines))
+
     def _log(self, message, level='info'):
         """Add entry to job log"""
-        timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-        log_entry = f"[{timestamp}] [{level.upper()}] {message}\n"
+        vals = {
+            'job_id': self.id,
+            'log_date': fields.Datetime.now(),
+            'level': level,
+            'message': message,
+        }
 
-        self.log_entries = (self.log_entries or '') + log_entry
-        _logger.log(getattr(logging, level.upper()), f"Job {self.name}: {message}")
+        # While a job runs, lines are buffered and written by _flush_log()
+        buffer = getattr(self, '_log_buffer', None)
+        if buffer is not None:
+            buffer.append(vals)
+        else:
+            self.env['dat.sql.import.job.log'].create(vals)
+        log_level = _LOG_LEVELS[level]
+        if _logger.isEnabledFor(log_level):
+            _logger.log(log_level, "Job %s: %s", self.name, message)
+
+    def _flush_log(self):
+        """Create the buffered log lines at once"""
+        buffer = getattr(self, '_log_buffer', None)
+        if buffer:
+            self.env['dat.sql.import.job.log'].create(buffer)
+            buffer.clear()
 
     def action_start(self):
-        """Start the import job"""
+        """Queue the import job, it is run by a worker outside of the HTTP request"""
         self.ensure_one()
 
         if self.state != 'draft':
             raise UserError(_('Job must be in draft state to start'))
 
+        self.write({'state': 'queued'})
+
+        if hasattr(self, 'with_delay'):
+            # queue_job is installed: run on its dedicated workers
+            self.with_delay()._execute_import()
+        else:
+            self.env.ref('data_migrator.ir_cron_run_pending_imports')._trigger()
+
+    @api.model
+    def _cron_run_pending(self):
+        """Run the queued import jobs, oldest first"""
+        if hasattr(self, 'with_delay'):
+            # queue_job is installed: action_start already enqueued them
+            return
+        for job in self.search([('state', '=', 'queued')], order='create_date'):
+            job._execute_import()
+            self.env.cr.commit()
+
+    def _execute_import(self):
+        """Run a queued import job"""
+        self.ensure_one()
+
+        # Claim the job, it may be cancelled or picked up by another worker
+        self.env.cr.execute(SQL(
+            "SELECT id FROM %s WHERE id = %s AND state = 'queued' FOR UPDATE SKIP LOCKED",
+            SQL.identifier(self._table), self.id,
+        ))
+        if not self.env.cr.fetchone():
+            return
+
         self.write({
             'state': 'running',
             'start_date': fields.Datetime.now(),
-            'log_entries': '',
             'imported_records': 0,
             'failed_records': 0,
             'error_message': False
         })
+        # Make the running state visible to the UI while the import goes on
+        self.env.cr.commit()
 
+        self._log_buffer = []
         try:
             self._log('Starting import job')
             self._run_import()
@@ -109,13 +496,25 @@ class SqlImportJob(models.Model):
                 f'Import completed successfully. Imported: {self.imported_records}, Failed: {self.failed_records}')
 
         except Exception as e:
+            # Drop the failed batch, keep what the previous commits imported
+            self.env.cr.rollback()
             self.write({
                 'state': 'error',
                 'end_date': fields.Datetime.now(),
                 'error_message': str(e)
             })
             self._log(f'Import failed: {str(e)}', 'error')
-            raise
+        finally:
+            self._flush_log()
+            self._log_buffer = None
+
+    def _source_from_clause(self, where=None, sample_percent=None):
+        """FROM/WHERE clause of the mapping's source table, see the mapping's _source_from_clause()
+
+        :param sample_percent: only read this percentage of the table pages,
+            the same ones for every run of the job
+        """
+        return self.mapping_id._source_from_clause(where, sample_percent, seed=self.id)
 
     def _run_import(self):
         """Execute the actual import"""
@@ -125,93 +524,317 @@ class SqlImportJob(models.Model):
         # Validate mapping
         mapping.validate_mapping()
 
-        field_mappings = json.loads(mapping.field_mappings or '[]')
+        field_mappings = mapping.parsed_field_mappings or []
 
         if not field_mappings:
             raise UserError(_('No field mappings defined'))
 
-        # Count total records
-        self._log('Counting source records...')
+        self._log(f'Batch size: {self._get_batch_size(field_mappings)}')
 
+        # One source connection for the count and the import
         with mapping.connection_ids.get_connection() as conn:
-            cursor = conn.cursor()
-            count_query = f"""
-                SELECT COUNT(*) 
-                FROM [{mapping.source_table_id.schema_name}].[{mapping.source_table_id.table_name}]  
-            """
+            if mapping.source_page_size > 0:
+                self._check_page_key(field_mappings[0]['source_field'], conn)
+
+            # Count total records, only when asked for: it costs one more pass over the source
+            self.total_records = 0
+            if mapping.compute_total:
+                self._log('Counting source records...')
+                self.total_records = self._count_source_records(conn)
+                self._log(f'Found {self.total_records} records to import')
+
+            # Fetch and import data
+            if mapping.parallel_workers > 1:
+                imported, failed = self._run_parallel_import(field_mappings, conn)
+            else:
+                imported, failed = self._import_range(field_mappings, conn=conn)
+            self.write({'imported_records': imported, 'failed_records': failed})
 
-            cursor.execute(count_query)
-            self.total_records = cursor.fetchone()[0]
-            self._log(f'Found {self.total_records} records to import')
+            if self.verification_enabled:
+                self._log('Starting data verification ...')
+                self._verify_imported_data(conn)
 
-        # Fetch and import data
-        with mapping.connection_ids.get_connection() as conn:
+    def _check_page_key(self, key_field, conn):
+        """Refuse keyset paging on a key that could skip source rows
+
+        Rows with a NULL key are never selected after the first page, and
+        those sharing a key value with the end of a page are skipped.
+        """
+        column = next((c for c in self.mapping_id._get_source_columns() if c.name == key_field), None)
+        if column and column.nullable:
+            raise UserError(_('Cannot page the source on %s: the column is nullable') % key_field)
+
+        key = _quote_identifier(key_field)
+        cursor = conn.cursor()
+        try:
+            # Stops at the first duplicate, an index on the key avoids the sort
+            cursor.execute(f"SELECT TOP (1) {key} {self._source_from_clause()} "
+                           f"GROUP BY {key} HAVING COUNT_BIG(*) > 1")
+            duplicate = cursor.fetchone()
+        finally:
+            cursor.close()
+        if duplicate:
+            raise UserError(_('Cannot page the source on %s: value %s is not unique') % (key_field, duplicate[0]))
+
+    def _count_source_records(self, conn):
+        """Number of source records, from the partition statistics when possible"""
+        mapping = self.mapping_id
+        cursor = conn.cursor()
+        try:
+            if not mapping.source_filter:
+                # Unfiltered table: the partition statistics hold the row count
+                table = mapping.source_table_id
+                try:
+                    cursor.execute(
+                        "SELECT SUM(row_count) FROM sys.dm_db_partition_stats "
+                        "WHERE object_id = OBJECT_ID(%s) AND index_id IN (0, 1)",
+                        (f"{_quote_identifier(table.schema_name)}.{_quote_identifier(table.table_name)}",))
+                    count = cursor.fetchone()[0]
+                    if count is not None:
+                        return count
+                except pymssql.Error as e:
+                    # Reading the statistics needs VIEW DATABASE STATE
+                    self._log(f'Partition statistics not available, counting rows: {str(e)}', 'warning')
+
+            cursor.execute(f"SELECT COUNT_BIG(*) {self._source_from_clause()}")
+            return cursor.fetchone()[0]
+        finally:
+            cursor.close()
+
+    def _get_target_model(self):
+        """Target model set up for mass creation
+
+        Mail tracking, chatter messages and follower subscriptions are
+        disabled. Stored computes are not recomputed per create: the ORM
+        defers them to the flush that the commit at each boundary performs.
+        """
+        return self.mapping_id._get_target_model().with_context(
+            tracking_disable=True,
+            mail_create_nolog=True,
+            mail_create_nosubscribe=True,
+            mail_notrack=True,
+            prefetch_fields=False,
+        )
+
+    def _get_batch_size(self, field_mappings):
+        """Batch size of the mapping, capped so one batch stays within _BATCH_TARGET_BYTES
+
+        Wide rows get smaller batches, but never under _MIN_BATCH_SIZE
+        unless the mapping itself asks for fewer rows.
+        """
+        return max(1, min(self.mapping_id.batch_size, _batch_size_budget(len(field_mappings))))
+
+    def _import_range(self, field_mappings, where=None, track_progress=True, conn=None):
+        """Fetch the source rows matching ``where`` and import them in batches
+
+        :param where: extra SQL condition restricting the source rows
+        :param track_progress: write the counters on the job at each commit
+        :param conn: open source connection to use, a new one is opened otherwise
+        :return: tuple (imported, failed)
+        """
+        mapping = self.mapping_id
+
+        with nullcontext(conn) if conn else mapping.connection_ids.get_connection() as conn:
+            # Dedicated cursor for the data SELECT: pymssql streams its rows
+            # from the server as they are fetched, nothing is buffered up front
             cursor = conn.cursor()
+            # One driver-level fetch per batch
+            cursor.arraysize = self._get_batch_size(field_mappings)
 
             # Build select query
             source_fields = [m['source_field'] for m in field_mappings]
-            select_query = f"""
-                SELECT {', '.join(source_fields)}
-                FROM [{mapping.source_table_id.schema_name}].[{mapping.source_table_id.table_name}]  
-                {f'WHERE {mapping.source_filter}' if mapping.source_filter else ''}
-            """
-            cursor.execute(select_query)
-
-            # Process in batches
-            processed_count = 0
-            while True:
-                rows = cursor.fetchmany(mapping.batch_size)
-                if not rows:
-                    break
-
-                batch_data = []
-                for row in rows:
+            page_size = mapping.source_page_size
+            select_query = self._source_select_query(source_fields, where, page_size)
+            batches = None
+            try:
+                cursor.execute(select_query)
+                build_batch = self._get_batch_builder(field_mappings, cursor.description)
+                build_record = self._get_row_builder(field_mappings, cursor.description)
+                target_model = self._get_target_model()
+                write_batch = self._get_batch_writer(target_model, field_mappings)
+                skip_errors = mapping.skip_errors
+                tuner = None
+                if mapping.adaptive_batch_size:
+                    high = min(_ADAPTIVE_MAX_BATCH_SIZE, _batch_size_budget(len(field_mappings)))
+                    tuner = _BatchSizeTuner(cursor.arraysize, min(_ADAPTIVE_MIN_BATCH_SIZE, high), high)
+
+                # Process in batches, each in its own savepoint, committing every few batches
+                # Counters are kept locally and written at commit boundaries
+                processed_count = 0
+                imported = failed = 0
+                commit_every = max(mapping.commit_every, 1)
+                batches_since_commit = 0
+                if page_size > 0:
+                    batches = self._iter_source_pages(cursor, source_fields, where, page_size)
+                else:
+                    batches = _prefetch_batches(cursor)
+                for rows in batches:
                     try:
-                        record_data = self._prepare_record_data(row, field_mappings)
-                        batch_data.append(record_data)
-                        processed_count += 1
-
-                    except Exception as e:
-                        self.failed_records += 1
-                        self._log(f'Failed to prepare record {processed_count}: {str(e)}', 'warning')
+                        batch_data = build_batch(rows)
+                        processed_count += len(batch_data)
+                    except Exception:
+                        # Redo the batch row by row to report the failing records
+                        batch_data = []
+                        for row in rows:
+                            try:
+                                record_data = build_record(row)
+                                batch_data.append(record_data)
+                                processed_count += 1
+
+                            except Exception as e:
+                                failed += 1
+                                self._log(f'Failed to prepare record {processed_count}: {str(e)}', 'warning')
+
+                                if not skip_errors:
+                                    raise
+
+                    # Import batch
+                    if batch_data:
+                        try:
+                            started = time.perf_counter()
+                            # A failed batch only rolls back its own savepoint
+                            with self.env.cr.savepoint():
+                                imported += write_batch(target_model, batch_data, mapping)
+                            if tuner:
+                                # Picked up by the next fetchmany() of the prefetch thread
+                                cursor.arraysize = tuner.record(len(batch_data), time.perf_counter() - started)
+
+                        except Exception as e:
+                            failed += len(batch_data)
+                            self._log(f'Failed to import batch: {str(e)}', 'warning')
+
+                            if not skip_errors:
+                                raise
+
+                    batches_since_commit += 1
+                    if batches_since_commit >= commit_every:
+                        if track_progress:
+                            self.write({'imported_records': imported, 'failed_records': failed})
+                        self._flush_log()
+                        self.env.cr.commit()
+                        batches_since_commit = 0
+                    if self.total_records:
+                        self._log(f'Processed {imported + failed}/{self.total_records} records')
+                    else:
+                        self._log(f'Processed {imported + failed} records')
+
+                if tuner and track_progress and tuner.size != mapping.batch_size:
+                    # Start the next imports of this mapping from the learned size
+                    self._log(f'Adaptive batch size settled on {tuner.size} rows')
+                    mapping.batch_size = tuner.size
+                if batches_since_commit:
+                    self._flush_log()
+                    self.env.cr.commit()
+            finally:
+                # Stop the prefetch thread before the cursor goes away
+                if batches is not None:
+                    batches.close()
+                # Release the server-side result set even when the import fails
+                cursor.close()
+
+        return imported, failed
+
+    def _source_select_query(self, source_fields, where=None, page_size=0, after=None):
+        """SELECT of the mapped source columns
+
+        With a page size, only the first page_size rows ordered on the first
+        column are selected, those whose key is above ``after`` if given.
+        """
+        columns = ', '.join(map(_quote_identifier, source_fields))
+        if page_size <= 0:
+            return f"SELECT {columns} {self._source_from_clause(where)}"
+
+        key = _quote_identifier(source_fields[0])
+        conditions = [where] if where else []
+        if after is not None:
+            conditions.append(f"{key} > {_quote_literal(after)}")
+        return (f"SELECT TOP ({page_size}) {columns} {self._source_from_clause(' AND '.join(conditions))} "
+                f"ORDER BY {key}")
+
+    def _iter_source_pages(self, cursor, source_fields, where, page_size):
+        """Yield the batches of the source rows, one keyset page at a time
+
+        The first page must already be executed on the cursor. Each next page
+        starts after the last key of the previous one, so no statement holds
+        more than page_size rows and a dropped connection only loses a page.
+        """
+        while True:
+            count = 0
+            last_key = None
+            with closing(_prefetch_batches(cursor)) as batches:
+                for rows in batches:
+                    count += len(rows)
+                    last_key = rows[-1][0]
+                    yield rows
+            if count < page_size:
+                return
+            try:
+                query = self._source_select_query(source_fields, where, page_size, after=last_key)
+            except TypeError as e:
+                raise UserError(_('Cannot page the source on %s: %s') % (source_fields[0], str(e)))
+            cursor.execute(query)
+
+    def _run_parallel_import(self, field_mappings, conn):
+        """Split the source on its key column and import the ranges in parallel
+
+        The first mapped source field is the key, as for the verification.
+        Each range runs in its own thread with its own SQL Server connection
+        and Odoo cursor; the counters are summed once all ranges are done.
+        """
+        mapping = self.mapping_id
+        key = _quote_identifier(field_mappings[0]['source_field'])
+
+        cursor = conn.cursor()
+        cursor.execute(f"SELECT MIN({key}), MAX({key}) {self._source_from_clause()}")
+        low, high = cursor.fetchone()
+        cursor.close()
+
+        if low is None:
+            # Empty source, or only NULL keys
+            return self._import_range(field_mappings, conn=conn)
+        if not isinstance(low, int) or not isinstance(high, int):
+            self._log(f'Key {key} is not an integer column, importing serially', 'warning')
+            return self._import_range(field_mappings, conn=conn)
+
+        workers = min(mapping.parallel_workers, high - low + 1)
+        step = (high - low) // workers + 1
+        ranges = [f"{key} BETWEEN {lo} AND {min(lo + step - 1, high)}" for lo in range(low, high + 1, step)]
+        # The rows without a key are in none of the ranges
+        ranges.append(f"{key} IS NULL")
+        self._log(f'Importing {len(ranges)} key ranges of {key} with {workers} workers')
+
+        # The workers' cursors only see committed data
+        self.env.cr.commit()
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [
+                executor.submit(self._import_range_in_worker, field_mappings, where)
+                for where in ranges
+            ]
+            results = [future.result() for future in futures]
+
+        return sum(r[0] for r in results), sum(r[1] for r in results)
+
+    def _import_range_in_worker(self, field_mappings, where):
+        """Run _import_range on a dedicated cursor, from a worker thread"""
+        with self.env.registry.cursor() as cr:
+            job = self.with_env(self.env(cr=cr))
+            # Log lines are written with this cursor's commits
+            job._log_buffer = []
+            try:
+                return job._import_range(field_mappings, where, track_progress=False)
+            finally:
+                job._flush_log()
 
-                        if not mapping.skip_errors:
-                            raise
+    def _verify_imported_data(self, conn=None):
+        """Verify imported data against source using only field mappings
 
-                # Import batch
-                if batch_data:
-                    try:
-                        if mapping.target_mode == 'create':
-                            self.env[mapping.target_model].create(batch_data)
-                            self.imported_records += len(batch_data)
-                        elif mapping.target_mode == 'update':
-                            # Implementation depends on your update logic
-                            self._update_records(batch_data, mapping)
-                        elif mapping.target_mode == 'create_update':
-                            # Implementation depends on your create_update logic
-                            self._create_or_update_records(batch_data, mapping)
-
-                    except Exception as e:
-                        self.failed_records += len(batch_data)
-                        self._log(f'Failed to import batch: {str(e)}', 'warning')
-
-                        if not mapping.skip_errors:
-                            raise
-
-                # Commit batch
-                self.env.cr.commit()
-                self._log(f'Processed {self.imported_records + self.failed_records}/{self.total_records} records')
-
-        if self.verification_enabled:
-            self._log('Starting data verification ...')
-            self._verify_imported_data()
-
-    def _verify_imported_data(self):
-        """Verify imported data against source using only field mappings"""
+        :param conn: open source connection to use, a new one is opened otherwise
+        """
         self.write({'verification_status': 'running'})
 
         mapping = self.mapping_id
-        field_mappings = json.loads(mapping.field_mappings or '[]')
+        field_mappings = mapping.parsed_field_mappings or []
 
         if not field_mappings:
             self._log('No field mappings defined - skipping verification', 'warning')
@@ -223,51 +846,119 @@ class SqlImportJob(models.Model):
 
         mismatches = []
         total_verified = 0
+        sample_percent = self.verification_sample_percent if 0 < self.verification_sample_percent < 100 else None
 
         try:
-            # Only verify fields that are in field_mappings
-            source_data = self._get_source_mapped_data(field_mappings)
-            target_data = self._get_target_mapped_data(field_mappings)
-
-            self._log(f'Source records count: {len(source_data)}')
-            self._log(f'Target records count: {len(target_data)}')
-
-            # Compare each source record with target
-            for source_key, source_values in source_data.items():
-                total_verified += 1
-
-                if source_key not in target_data:
-                    mismatches.append(f"Missing record in target: {source_key}")
-                    continue
-
-                target_values = target_data[source_key]
-
-                # Compare each mapped field
-                for i, field_mapping in enumerate(field_mappings):
-                    source_field = field_mapping['source_field']
-                    target_field = field_mapping['target_field']
+            if sample_percent:
+                # The sample cannot tell missing or extra records: compare the full counts
+                with nullcontext(conn) if conn else mapping.connection_ids.get_connection() as source_conn:
+                    source_count = self._count_source_records(source_conn)
+                target_model = mapping._get_target_model()
+                target_total = target_model.search_count(self._get_verification_domain(target_model))
+                if source_count != target_total:
+                    mismatches.append(f"Record count mismatch: Source={source_count}, Target={target_total}")
+                self._log(f'Verifying a {sample_percent:g}% sample of the source records')
+
+            # Only verify fields that are in field_mappings: one digest per record
+            # on each side, loaded into temporary tables and compared by PostgreSQL
+            cr = self.env.cr
+            # A failure rolls the temporary tables back with the savepoint
+            with cr.savepoint():
+                cr.execute("CREATE TEMP TABLE dat_verify_source (key text, digest bytea)")
+                cr.execute("CREATE TEMP TABLE dat_verify_target (key text, digest bytea)")
+                # Closed on failure too, so its prefetch thread stops with it
+                with closing(self._iter_source_mapped_data(
+                        field_mappings, digest=True, conn=conn, sample_percent=sample_percent)) as source_items:
+                    total_verified = self._load_verification_digests('dat_verify_source', source_items)
+                if sample_percent:
+                    # Only the sampled source records are looked up in the target
+                    cr.execute("SELECT key FROM dat_verify_source")
+                    sample_keys = {key for key, in cr.fetchall()}
+                    target_items = self._iter_target_mapped_data(
+                        field_mappings, digest=True, keys=sample_keys,
+                        records=self._get_verification_targets(sample_keys))
+                else:
+                    target_items = self._iter_cached_target_digests(field_mappings)
+                target_count = self._load_verification_digests('dat_verify_target', target_items)
+
+                self._log(f'Source records count: {total_verified}')
+                self._log(f'Target records count: {target_count}')
+
+                # Number of differing records of each kind, with the first keys of each
+                cr.execute(SQL("""
+                    SELECT kind, total, key
+                      FROM (SELECT key, kind, count(*) OVER w AS total, row_number() OVER (w ORDER BY key) AS rank
+                              FROM (SELECT key,
+                                           CASE WHEN t.digest IS NULL THEN 'missing'
+                                                WHEN s.digest IS NULL THEN 'extra'
+                                                ELSE 'changed' END AS kind
+                                      FROM dat_verify_source s
+                                      FULL OUTER JOIN dat_verify_target t USING (key)
+                                     WHERE s.digest IS DISTINCT FROM t.digest) AS differences
+                            WINDOW w AS (PARTITION BY kind)) AS ranked
+                     WHERE rank <= %s
+                     ORDER BY kind, key
+                """, _VERIFY_MAX_EXAMPLES))
+                differences = cr.fetchall()
+                cr.execute("DROP TABLE dat_verify_source, dat_verify_target")
+
+            counts = dict.fromkeys(('missing', 'changed', 'extra'), 0)
+            examples = {kind: [] for kind in counts}
+            for kind, total, key in differences:
+                counts[kind] = total
+                examples[kind].append(key)
+            different_count = sum(counts.values())
+            if different_count:
+                mismatches.append(f"{counts['missing']} missing, {counts['changed']} changed "
+                                  f"and {counts['extra']} extra records")
+
+            for key in examples['missing']:
+                mismatches.append(f"Missing record in target: {key}")
+
+            # Only the first records whose digests differ are fetched again, field by field
+            changed_keys = examples['changed']
+            if changed_keys:
+                keys = set(changed_keys)
+                source_data = {str(key): values for key, values
+                               in self._iter_source_mapped_data(field_mappings, keys=keys, conn=conn)}
+                target_data = {str(key): values for key, values
+                               in self._iter_target_mapped_data(
+                                   field_mappings, keys=keys, records=self._get_verification_targets(keys))}
+
+                for source_key in changed_keys:
+                    source_values = source_data[source_key]
+                    target_values = target_data[source_key]
+
+                    # Compare each mapped field
+                    for i, field_mapping in enumerate(field_mappings):
+                        source_field = field_mapping['source_field']
+                        target_field = field_mapping['target_field']
 
-                    if i < len(source_values) and i < len(target_values):
-                        if source_values[i] != target_values[i]:
-                            mismatches.append(
-                                f"Data mismatch for record {source_key}, field '{source_field}' -> '{target_field}': "
-                                f"Source='{source_values[i]}', Target='{target_values[i]}'"
-                            )
+                        if i < len(source_values) and i < len(target_values):
+                            if source_values[i] != target_values[i]:
+                                mismatches.append(
+                                    f"Data mismatch for record {source_key}, field '{source_field}' -> '{target_field}': "
+                                    f"Source='{source_values[i]}', Target='{target_values[i]}'"
+                                )
 
             # Check for extra records in target
-            for target_key in target_data:
-                if target_key not in source_data:
-                    mismatches.append(f"Extra record in target: {target_key}")
+            for target_key in examples['extra']:
+                mismatches.append(f"Extra record in target: {target_key}")
+
+            for kind in counts:
+                if counts[kind] > len(examples[kind]):
+                    mismatches.append(f"... and {counts[kind] - len(examples[kind])} more {kind} records")
 
             self.write({
-                'checksum_mismatches': len(mismatches),
+                'checksum_mismatches': different_count,
                 'verification_status': 'failed' if mismatches else 'passed',
-                'verification_details': '\n'.join(
-                    mismatches) if mismatches else f'All {total_verified} records verified successfully'
+                'verification_details': '\n'.join(mismatches) if mismatches else (
+                    f'All {total_verified} sampled records verified successfully' if sample_percent
+                    else f'All {total_verified} records verified successfully')
             })
 
             if mismatches:
-                self._log(f'Verification failed: {len(mismatches)} mismatches found', 'warning')
+                self._log(f'Verification failed: {mismatches[0]}', 'warning')
             else:
                 self._log(f'Verification passed: All {total_verified} records match', 'info')
 
@@ -278,207 +969,243 @@ class SqlImportJob(models.Model):
             })
             self._log(f'Verification error: {str(e)}', 'error')
 
-    def _get_source_mapped_data(self, field_mappings):
+    def _load_verification_digests(self, table, items, chunk_size=10000):
+        """Insert the (key, digest) pairs into a verification temporary table
+
+        :return: number of inserted rows
+        """
+        count = 0
+        for chunk in split_every(chunk_size, items):
+            keys, digests = zip(*chunk)
+            self.env.cr.execute(SQL(
+                "INSERT INTO %s (key, digest) SELECT * FROM unnest(%s::text[], %s::bytea[])",
+                SQL.identifier(table), [str(key) for key in keys], list(digests),
+            ))
+            count += len(chunk)
+        return count
+
+    def _get_source_mapped_data(self, field_mappings, digest=False, keys=None, conn=None):
         """Get source data indexed by the first field (usually ID)"""
-        data = {}
+        return dict(self._iter_source_mapped_data(field_mappings, digest, keys, conn))
+
+    def _iter_source_mapped_data(self, field_mappings, digest=False, keys=None, conn=None, sample_percent=None):
+        """Yield (first field value, normalized values) for each source record
+
+        :param digest: yield the _row_digest() of each record instead of its values
+        :param keys: only yield the records whose key, as text, is in this set
+        :param conn: open source connection to use, a new one is opened otherwise
+        :param sample_percent: only read a sample of the source, see _source_from_clause()
+        """
+        count = 0
         mapping = self.mapping_id
 
         # Build unique field list to avoid duplicates
         unique_fields = []
-        seen_fields = set()
+        field_to_index = {}
 
         for fm in field_mappings:
             field_name = fm['source_field']
-            if field_name not in seen_fields:
-                unique_fields.append(f"[{field_name}]")
-                seen_fields.add(field_name)
+            if field_name not in field_to_index:
+                field_to_index[field_name] = len(unique_fields)
+                unique_fields.append(_quote_identifier(field_name))
 
         if not unique_fields:
             raise UserError('No fields to verify - field mappings is empty')
 
-        # The first field should be our ID field
-        id_field = field_mappings[0]['source_field']
+        # Row index and transform of each mapping, resolved once for all rows
+        columns = [(field_to_index[fm['source_field']], _NORMALIZERS.get(fm.get('transform', 'direct'), _n_direct))
+                   for fm in field_mappings]
+        normalizers = tuple(normalize for _index, normalize in columns)
+        # Without duplicated source fields the row columns are in mapping order
+        in_row_order = len(unique_fields) == len(field_mappings)
 
-        with mapping.connection_ids.get_connection() as conn:
+        with nullcontext(conn) if conn else mapping.connection_ids.get_connection() as conn:
             cursor = conn.cursor()
+            # Read the whole table in large fetchmany() batches rather than one fetchall()
+            cursor.arraysize = max(mapping.fetch_size, 1)
 
-            schema_name = mapping.source_table_id.schema_name
-            table_name = mapping.source_table_id.table_name
-
-            query = f"""
-            SELECT {', '.join(unique_fields)}
-            FROM [{schema_name}].[{table_name}]
-            {f'WHERE {mapping.source_filter}' if mapping.source_filter else ''}
-            ORDER BY [{id_field}]
-            """
+            # No ORDER BY: the records are matched on their key, the first
+            # field, so the source does not have to sort the whole table
+            query = f"SELECT {', '.join(unique_fields)} {self._source_from_clause(sample_percent=sample_percent)}"
 
             self._log(f'Source verification query: {query}')
 
             try:
                 cursor.execute(query)
 
-                for row in cursor.fetchall():
-                    record_id = row[0]  # First field (ID)
-                    record_values = []
-
-                    # Map row values back to field mappings
-                    field_to_index = {fm['source_field']: i for i, field in enumerate(unique_fields)
-                                      for fm in field_mappings if f"[{fm['source_field']}]" == field}
-
-                    for field_mapping in field_mappings:
-                        source_field = field_mapping['source_field']
-                        field_index = field_to_index.get(source_field, 0)
-                        raw_value = row[field_index]
-
-                        transform = field_mapping.get('transform', 'direct')
-                        normalized_value = self._normalize_value_for_comparison(raw_value, transform)
-                        record_values.append(normalized_value)
+                # The next batches are fetched while this one is hashed and
+                # its digests are loaded into PostgreSQL
+                with closing(_prefetch_batches(cursor)) as batches:
+                    for rows in batches:
+                        for row in rows:
+                            record_id = row[0]  # First field (ID)
+                            if keys is not None and str(record_id) not in keys:
+                                continue
+                            if in_row_order:
+                                record_values = [normalize(value) for normalize, value in zip(normalizers, row)]
+                            else:
+                                record_values = [normalize(row[index]) for index, normalize in columns]
 
-                    data[record_id] = record_values
+                            count += 1
+                            yield record_id, _row_digest(record_values) if digest else record_values
 
-                self._log(f'Retrieved {len(data)} source records for verification')
+                self._log(f'Retrieved {count} source records for verification')
 
             except Exception as e:
                 self._log(f'Source data query failed: {str(e)}', 'error')
                 raise UserError(f'Failed to get source data: {str(e)}')
 
-        return data
-
     def _normalize_value_for_comparison(self, value, transform):
         """Normalize values consistently for comparison between source and target"""
-        if value is None or value is False:
-            return 'NULL'
+        return _NORMALIZERS.get(transform, _n_direct)(value)
 
-        if transform == 'bool':
-            return '1' if value else '0'
-        elif transform == 'int':
-            try:
-                return str(int(value))
-            except (ValueError, TypeError):
-                return 'NULL'
-        elif transform == 'float':
-            try:
-                float_val = float(value)
-                if float_val.is_integer():
-                    return str(int(float_val))
-                else:
-                    return f"{float_val:.6f}".rstrip('0').rstrip('.')
-            except (ValueError, TypeError):
-                return 'NULL'
-        elif transform in ['str', 'email']:  # Treat both as strings for comparison
-            if value == '':
-                return ''
-            return str(value).strip() if value else 'NULL'
-        elif transform in ['date', 'datetime']:
-            if hasattr(value, 'strftime'):
-                if transform == 'date':
-                    return value.strftime('%Y-%m-%d')
-                else:
-                    return value.strftime('%Y-%m-%d %H:%M:%S.%f')[:-3]
-            else:
-                return str(value) if value else 'NULL'
-        else:  # direct
-            if value == '':
-                return ''
-            return str(value).strip() if value else 'NULL'
-
-    def _source_datatype_management(self, data_type, field, binary_field_count=0, text_field_count=0):
-        # Create local copies to modify
-        local_binary_count = binary_field_count
-        local_text_count = text_field_count
-
-        if data_type in ['image', 'varbinary', 'binary']:
-            local_binary_count += 1
-            checksum_part = f"""
-                 ISNULL(
-                     CAST(DATALENGTH([{field}]) AS NVARCHAR(20)) + ':' +
-                     CASE 
-                         WHEN DATALENGTH([{field}]) > 0 THEN
-                             ISNULL(CONVERT(NVARCHAR(50), SUBSTRING([{field}], 1, CASE WHEN DATALENGTH([{field}]) >= 16 THEN 16 ELSE DATALENGTH([{field}]) END), 2), '') + ':' +
-                             CASE 
-                                 WHEN DATALENGTH([{field}]) > 16 THEN ISNULL(CONVERT(NVARCHAR(50), SUBSTRING([{field}], DATALENGTH([{field}]) - 15, 16), 2), '')
-                                 ELSE ''
-                             END
-                         ELSE 'EMPTY'
-                     END,
-                     'NULL'
-                 )"""
-
-        elif data_type in ['text', 'ntext']:
-            # For large text fields: use length + checksum of content
-            local_binary_count += 1
-            local_text_count += 1
-            checksum_part = f"""
-                 ISNULL(
-                     CAST(LEN([{field}]) AS NVARCHAR(20)) + ':' +
-                     CAST(CHECKSUM([{field}]) AS NVARCHAR(20)),
-                     'NULL'
-                 )"""
-
-        elif data_type in ['datetime', 'datetime2', 'smalldatetime']:
-            checksum_part = f"ISNULL(CONVERT(NVARCHAR(50), [{field}], 121), 'NULL')"
-
-        elif data_type == 'date':
-            checksum_part = f"ISNULL(CONVERT(NVARCHAR(50), [{field}], 23), 'NULL')"
-
-        elif data_type == 'time':
-            checksum_part = f"ISNULL(CONVERT(NVARCHAR(50), [{field}], 108), 'NULL')"
-
-        elif data_type in ['float', 'real']:
-            checksum_part = f"ISNULL(CAST([{field}] AS NVARCHAR(50)), 'NULL')"
-
-        elif data_type in ['decimal', 'numeric', 'money', 'smallmoney']:
-            checksum_part = f"ISNULL(CAST([{field}] AS NVARCHAR(50)), 'NULL')"
-
-        elif data_type in ['bit']:
-            checksum_part = f"ISNULL(CAST([{field}] AS NVARCHAR(1)), 'NULL')"
-
-        elif data_type in ['uniqueidentifier']:
-            checksum_part = f"ISNULL(CAST([{field}] AS NVARCHAR(50)), 'NULL')"
-
-        else:
-            checksum_part = f"ISNULL(CAST([{field}] AS NVARCHAR(MAX)), 'NULL')"
-
-        return checksum_part, local_binary_count, local_text_count
-
-    def _get_target_mapped_data(self, field_mappings):
+    def _get_target_mapped_data(self, field_mappings, digest=False, keys=None):
         """Get target data for only the mapped fields"""
-        data = {}
-        mapping = self.mapping_id
+        return dict(self._iter_target_mapped_data(field_mappings, digest, keys))
 
-        target_model = self.env[mapping.target_model]
+    @api.model
+    def _get_verification_domain(self, target_model, keys=None):
+        """Domain of the target records compared with the source
 
+        :param keys: only the records whose legacy id is in this set
+        """
         # Find records that have legacy_id (imported records)
-        domain = []
-        if 'legacy_id' in target_model._fields:
-            domain = [('legacy_id', '!=', False)]
+        if 'legacy_id' not in target_model._fields:
+            return [('id', 'in', [int(key) for key in keys if key.isdigit()])] if keys is not None else []
+        if keys is not None:
+            return [('legacy_id', 'in', list(keys))]
+        return [('legacy_id', '!=', False)]
 
-        records = target_model.search(domain, order='legacy_id')
+    def _get_verification_targets(self, keys=None):
+        """Target records compared with the source by the verification
 
-        self._log(f'Found {len(records)} target records to verify')
-
-        for record in records:
-            # Use legacy_id as identifier, fallback to id
-            record_id = getattr(record, 'legacy_id', record.id)
-            record_values = []
+        :param keys: only the records whose key, as text, is in this set
+        """
+        target_model = self.mapping_id._get_target_model()
+        has_legacy_id = 'legacy_id' in target_model._fields
 
-            # Process each mapped field
-            for field_mapping in field_mappings:
-                target_field = field_mapping['target_field']
-                transform = field_mapping.get('transform', 'direct')
+        domain = self._get_verification_domain(target_model, keys)
+        records = target_model.search(domain, order='legacy_id' if has_legacy_id else 'id')
 
-                # Skip system fields that don't need verification
-                if target_field in ['create_uid', 'write_uid', 'create_date', 'write_date', 'display_name']:
-                    record_values.append('NULL')
-                    continue
-
-                raw_value = getattr(record, target_field, None)
-                normalized_value = self._normalize_target_value(raw_value, transform)
-                record_values.append(normalized_value)
+        self._log(f'Found {len(records)} target records to verify')
+        return records
+
+    def _iter_target_mapped_data(self, field_mappings, digest=False, keys=None, records=None):
+        """Yield (legacy id, normalized values) for each target record
+
+        :param digest: yield the _row_digest() of each record instead of its values
+        :param keys: only yield the records whose key, as text, is in this set
+        :param records: target records to read, _get_verification_targets() otherwise
+        """
+        if records is None:
+            records = self._get_verification_targets()
+        target_model = records.browse()
+        has_legacy_id = 'legacy_id' in target_model._fields
+
+        # Skip system fields that don't need verification
+        read_fields = {
+            fm['target_field'] for fm in field_mappings
+            if fm['target_field'] in target_model._fields and fm['target_field'] not in _VERIFY_SKIPPED_FIELDS
+        }
+        if has_legacy_id:
+            read_fields.add('legacy_id')
+        columns = [(fm['target_field'], _NORMALIZERS.get(fm.get('transform', 'direct'), _n_direct))
+                   for fm in field_mappings]
+
+        key_field = 'legacy_id' if has_legacy_id else 'id'
+
+        # Plain values in one query per chunk, relational fields as ids
+        for chunk in split_every(models.PREFETCH_MAX, records.ids, records.browse):
+            rows = chunk.read(list(read_fields), load=None)
+            if keys is not None:
+                rows = [row for row in rows if str(row[key_field]) in keys]
+            # Use legacy_id as identifier, fallback to id
+            record_ids = [row[key_field] for row in rows]
+
+            # Normalize column by column, each with a single map()
+            normalized = zip(*[
+                ['NULL'] * len(rows) if target_field in _VERIFY_SKIPPED_FIELDS
+                else map(normalize, [row.get(target_field) for row in rows])
+                for target_field, normalize in columns
+            ])
+            yield from zip(record_ids, map(_row_digest, normalized) if digest else map(list, normalized))
+            # Keep the cache from growing with the whole target table
+            chunk.invalidate_recordset()
+
+    def _iter_cached_target_digests(self, field_mappings):
+        """Yield (legacy id, digest) for each target record, see _iter_target_mapped_data()
+
+        The digests are kept in dat.sql.import.checksum.cache with the
+        write_date of their record: only the records written since are read
+        and hashed again. Any cache failure falls back to hashing everything.
+        """
+        mapping = self.mapping_id
+        records = self._get_verification_targets()
+        if not records._log_access:
+            yield from self._iter_target_mapped_data(field_mappings, digest=True, records=records)
+            return
 
-            data[record_id] = record_values
+        cr = self.env.cr
+        table = SQL.identifier(records._table)
+        signature = hashlib.sha256(
+            f"{mapping.id}:{mapping.target_model}:{mapping.field_mappings}".encode()).hexdigest()
 
-        return data
+        cached = {}
+        use_cache = True
+        try:
+            records.flush_model(['write_date'])
+            with cr.savepoint():
+                cr.execute(SQL("""
+                    SELECT c.res_id, c.row_key, c.digest
+                      FROM dat_sql_import_checksum_cache c
+                      JOIN %s t ON t.id = c.res_id AND t.write_date = c.record_write_date
+                     WHERE c.job_id = %s AND c.signature = %s
+                """, table, self.id, signature))
+                cached = {res_id: (row_key, bytes(digest)) for res_id, row_key, digest in cr.fetchall()}
+                # Drop the outdated digests, the stale ones are stored again below
+                cr.execute(SQL("""
+                    DELETE FROM dat_sql_import_checksum_cache
+                     WHERE job_id = %s AND NOT (signature = %s AND res_id = ANY(%s))
+                """, self.id, signature, list(cached)))
+        except Exception as e:
+            self._log(f'Checksum cache unavailable, hashing all target records: {str(e)}', 'warning')
+            cached = {}
+            use_cache = False
+
+        stale_ids = [record_id for record_id in records.ids if record_id not in cached]
+        self._log(f'Reusing {len(records) - len(stale_ids)} cached target digests')
+        for record_id in records.ids:
+            if record_id in cached:
+                yield cached[record_id]
+
+        stale = records.browse(stale_ids)
+        items = zip(stale_ids, self._iter_target_mapped_data(field_mappings, digest=True, records=stale))
+        for chunk in split_every(10000, items):
+            for _record_id, item in chunk:
+                yield item
+            if use_cache:
+                use_cache = self._store_target_digests(table, signature, chunk)
+
+    def _store_target_digests(self, table, signature, items):
+        """Store (record id, (legacy id, digest)) items in the checksum cache
+
+        :return: whether the cache could be written
+        """
+        query = SQL("""
+            INSERT INTO dat_sql_import_checksum_cache
+                   (job_id, signature, res_id, row_key, digest, record_write_date, computed_at)
+            SELECT v.job_id, v.signature, v.res_id, v.row_key, v.digest, t.write_date, now() at time zone 'UTC'
+              FROM (VALUES """).code + "%s" + SQL(""") AS v (job_id, signature, res_id, row_key, digest)
+              JOIN %s t ON t.id = v.res_id
+        """, table).code
+        rows = [(self.id, signature, record_id, str(key), digest) for record_id, (key, digest) in items]
+        try:
+            with self.env.cr.savepoint():
+                execute_values(self.env.cr._obj, query, rows, page_size=1000)
+        except Exception as e:
+            self._log(f'Could not update the checksum cache: {str(e)}', 'warning')
+            return False
+        return True
 
     def action_verify_data(self):
         """Manual verification trigger"""
@@ -500,74 +1227,11 @@ class SqlImportJob(models.Model):
 
     def _normalize_source_value(self, value, transform):
         """Normalize source value based on transform type"""
-        if value is None:
-            return 'NULL'
-
-        if transform == 'bool':
-            return '1' if value else '0'
-        elif transform == 'int':
-            try:
-                return str(int(value))
-            except (ValueError, TypeError):
-                return 'NULL'
-        elif transform == 'float':
-            try:
-                float_val = float(value)
-                if float_val.is_integer():
-                    return str(int(float_val))
-                else:
-                    return f"{float_val:.6f}".rstrip('0').rstrip('.')
-            except (ValueError, TypeError):
-                return 'NULL'
-        elif transform == 'str':
-            return str(value).strip() if value != '' else ''
-        elif transform in ['date', 'datetime']:
-            if hasattr(value, 'strftime'):
-                if transform == 'date':
-                    return value.strftime('%Y-%m-%d')
-                else:
-                    return value.strftime('%Y-%m-%d %H:%M:%S.%f')[:-3]
-            else:
-                return str(value)
-        else:  # direct
-            return str(value).strip() if value != '' else ''
+        return _NORMALIZERS.get(transform, _n_direct)(value)
 
     def _normalize_target_value(self, value, transform):
         """Normalize target value based on transform type"""
-        if value is None or value is False:
-            return 'NULL'
-
-        if transform == 'bool':
-            return '1' if value else '0'
-        elif transform == 'int':
-            try:
-                return str(int(value))
-            except (ValueError, TypeError):
-                return 'NULL'
-        elif transform == 'float':
-            try:
-                float_val = float(value)
-                if float_val.is_integer():
-                    return str(int(float_val))
-                else:
-                    return f"{float_val:.6f}".rstrip('0').rstrip('.')
-            except (ValueError, TypeError):
-                return 'NULL'
-        elif transform == 'str':
-            return str(value).strip() if value != '' else ''
-        elif transform in ['date', 'datetime']:
-            if value and value != False:
-                if hasattr(value, 'strftime'):
-                    if transform == 'date':
-                        return value.strftime('%Y-%m-%d')
-                    else:
-                        return value.strftime('%Y-%m-%d %H:%M:%S.%f')[:-3]
-                else:
-                    return str(value)
-            else:
-                return 'NULL'
-        else:  # direct
-            return str(value).strip() if value != '' else ''
+        return _NORMALIZERS.get(transform, _n_direct)(value)
 
     def action_show_verification_report(self):
         self.ensure_one()
@@ -586,88 +1250,268 @@ class SqlImportJob(models.Model):
         }
 
 
-    def _prepare_record_data(self, row, field_mappings):
-        """Transform SQL row to Odoo record data"""
-        data = {}
+    def _compile_mappings(self, field_mappings, description=None):
+        """Resolve each mapping to a (target_field, transform function) pair once per job
 
+        When the cursor description is given, date/datetime transforms on
+        columns pymssql already returns as datetime objects skip the
+        string parsing path.
+        """
+        compiled = []
         for i, mapping in enumerate(field_mappings):
-            source_value = row[i]
-            target_field = mapping['target_field']
-            transform = mapping.get('transform', 'direct')
-
-            # Apply transformations
-            try:
-                if transform == 'direct':
-                    data[target_field] = source_value
-                elif transform == 'bool':
-                    if source_value is None:
-                        data[target_field] = False
-                    else:
-                        data[target_field] = bool(source_value)
-                elif transform == 'int':
-                    if source_value is None:
-                        data[target_field] = False  # Odoo uses False for NULL integers
-                    else:
-                        data[target_field] = int(source_value)
-                elif transform == 'float':
-                    if source_value is None:
-                        data[target_field] = False  # Odoo uses False for NULL floats
-                    else:
-                        # Preserve original precision by converting back to source format
-                        data[target_field] = float(source_value)
-                elif transform == 'str':
-                    if source_value is None:
-                        data[target_field] = False  # Odoo uses False for NULL strings
-                    elif source_value == '':
-                        data[target_field] = ''  # Preserve empty strings as empty strings
-                    else:
-                        data[target_field] = str(source_value).strip()
-                elif transform == 'date':
-                    if source_value:
-                        if isinstance(source_value, str):
-                            data[target_field] = parser.parse(source_value).date()
-                        else:
-                            data[target_field] = source_value.date() if hasattr(source_value, 'date') else source_value
-                    else:
-                        data[target_field] = False
-                elif transform == 'datetime':
-                    if source_value:
-                        if isinstance(source_value, str):
-                            data[target_field] = parser.parse(source_value)
-                        else:
-                            data[target_field] = source_value
-                    else:
-                        data[target_field] = False
+            transform_name = mapping.get('transform', 'direct')
+            transform = TRANSFORMS.get(transform_name, _t_direct)
+            if (description and transform_name in _NATIVE_DATETIME_TRANSFORMS
+                    and description[i][1] == pymssql.DATETIME):
+                transform = _NATIVE_DATETIME_TRANSFORMS[transform_name]
+            compiled.append((mapping['target_field'], transform))
+        return compiled
+
+    def _get_row_builder(self, field_mappings, description=None):
+        """Return the function turning a source row into record values"""
+        if all(mapping.get('transform', 'direct') == 'direct' for mapping in field_mappings):
+            # Nothing to convert: let dict(zip()) pair the values in C
+            target_fields = tuple(mapping['target_field'] for mapping in field_mappings)
+            return lambda row: dict(zip(target_fields, row))
+
+        compiled_mappings = self._compile_mappings(field_mappings, description)
+        return lambda row: self._prepare_record_data(row, compiled_mappings)
+
+    def _get_batch_builder(self, field_mappings, description=None):
+        """Return the function turning a batch of source rows into record values
+
+        The batch is transformed column by column: a column whose values all
+        have a type its transform leaves unchanged is used as is, the others
+        go through map(). Any error is left to the row by row fallback.
+        """
+        compiled_mappings = self._compile_mappings(field_mappings, description)
+        target_fields = tuple(target_field for target_field, _transform in compiled_mappings)
+        transforms = tuple(transform for _target_field, transform in compiled_mappings)
+
+        if all(transform is _t_direct for transform in transforms):
+            return lambda rows: [dict(zip(target_fields, row)) for row in rows]
+
+        def build_batch(rows):
+            columns = []
+            for column, transform in zip(zip(*rows), transforms):
+                noop_types = _NOOP_TYPES.get(transform)
+                if transform is _t_direct or (noop_types and noop_types.issuperset(map(type, column))):
+                    columns.append(column)
                 else:
-                    # Unknown transform, use direct
-                    data[target_field] = source_value
+                    columns.append(list(map(transform, column)))
+            return [dict(zip(target_fields, values)) for values in zip(*columns)]
 
-            except Exception as e:
-                raise UserError(f'Transform error for field {target_field}: {str(e)}')
+        return build_batch
 
-        return data
+    def _prepare_record_data(self, row, compiled_mappings):
+        """Transform SQL row to Odoo record data"""
+        try:
+            return {target_field: transform(row[i])
+                    for i, (target_field, transform) in enumerate(compiled_mappings)}
+        except Exception:
+            # Find the offending field for the error message
+            for i, (target_field, transform) in enumerate(compiled_mappings):
+                try:
+                    transform(row[i])
+                except Exception as e:
+                    raise UserError(f'Transform error for field {target_field}: {str(e)}')
+            raise
 
-    def _update_records(self, batch_data, mapping):
-        """Update existing records (to be implemented based on your needs)"""
-        # This is a placeholder - implement based on your specific update logic
-        # You'll need to define how to identify existing records
-        pass
+    def _get_batch_writer(self, target_model, field_mappings):
+        """Return the method writing a batch of record values for the import mode"""
+        mapping = self.mapping_id
+        if mapping.target_mode == 'create' and mapping.insert_method in ('sql', 'copy'):
+            target_fields = [m['target_field'] for m in field_mappings]
+            reason = self._get_sql_insert_blocker(target_model, target_fields)
+            if not reason:
+                return functools.partial(
+                    self._bulk_copy_sql if mapping.insert_method == 'copy' else self._bulk_insert_sql,
+                    defaults=self._get_sql_insert_defaults(target_model, target_fields))
+            self._log(f'Direct SQL insert not possible ({reason}), using the ORM', 'warning')
 
-    def _create_or_update_records(self, batch_data, mapping):
-        """Create or update records (to be implemented based on your needs)"""
-        # This is a placeholder - implement based on your specific create_update logic
-        # You'll need to define how to identify existing records
-        pass
+        return {
+            'create': self._batch_create,
+            'update': self._update_records,
+            'create_update': self._create_or_update_records,
+        }[mapping.target_mode]
+
+    def _batch_create(self, target_model, batch_data, mapping):
+        """Create the records of a batch at once
+
+        :return: number of created records
+        """
+        target_model.create(batch_data)
+        return len(batch_data)
+
+    @api.model
+    def _is_sql_column(self, field):
+        """Whether the field is a plain column an INSERT can fill as is"""
+        return field.store and field.column_type and not field.translate and not field.company_dependent
+
+    def _get_sql_insert_blocker(self, target_model, target_fields):
+        """Return why the target model must go through create(), or None"""
+        if target_model._inherits:
+            return _('delegation inheritance')
+        if target_model._parent_store:
+            return _('parent_path')
+        for name in target_fields:
+            if not self._is_sql_column(target_model._fields[name]):
+                return _('field %s is not a plain column') % name
+        stored_computes = [f.name for f in target_model._fields.values() if f.store and f.compute]
+        if stored_computes:
+            return _('stored computed fields %s') % ', '.join(stored_computes)
+        return None
+
+    def _get_sql_insert_defaults(self, target_model, target_fields):
+        """Default and audit column values for the rows inserted with SQL"""
+        model_fields = target_model._fields
+        columns = [name for name, field in model_fields.items()
+                   if name not in target_fields and name not in models.MAGIC_COLUMNS
+                   and self._is_sql_column(field)]
+        defaults = {
+            name: value
+            for name, value in target_model.default_get(columns).items()
+            if name in model_fields and self._is_sql_column(model_fields[name])
+        }
+        if target_model._log_access:
+            now = fields.Datetime.now()
+            defaults.update(create_uid=self.env.uid, create_date=now,
+                            write_uid=self.env.uid, write_date=now)
+        return defaults
+
+    def _get_sql_insert_rows(self, target_model, batch_data, defaults):
+        """Column names and value tuples of a batch for the direct SQL inserts
+
+        :return: tuple (columns, rows)
+        """
+        model_fields = target_model._fields
+        target_fields = list(batch_data[0])
+        columns = target_fields + list(defaults)
+
+        # The ORM uses False for NULL, except on boolean columns
+        nullable = [model_fields[name].type != 'boolean' for name in columns]
+        default_values = tuple(defaults.values())
+
+        rows = []
+        for vals in batch_data:
+            values = [vals.get(name) for name in target_fields]
+            values.extend(default_values)
+            rows.append(tuple(None if value is False and null else value for value, null in zip(values, nullable)))
+        return columns, rows
+
+    def _bulk_insert_sql(self, target_model, batch_data, mapping, defaults=None):
+        """Insert the records of a batch with multi-row INSERT ... VALUES statements
+
+        execute_values() sends insert_page_size rows per statement; the
+        columns not mapped get the same default value on every row.
+
+        :return: number of inserted records
+        """
+        columns, rows = self._get_sql_insert_rows(target_model, batch_data, defaults or {})
+
+        query = SQL(
+            "INSERT INTO %s (%s) VALUES ",
+            SQL.identifier(target_model._table),
+            SQL(", ").join(SQL.identifier(name) for name in columns),
+        ).code + "%s"
+        execute_values(self.env.cr._obj, query, rows, page_size=max(mapping.insert_page_size, 1))
+        return len(batch_data)
+
+    def _bulk_copy_sql(self, target_model, batch_data, mapping, defaults=None):
+        """Load the records of a batch with COPY FROM STDIN
+
+        The rows are streamed in COPY's text format, built column by column.
+
+        :return: number of inserted records
+        """
+        columns, rows = self._get_sql_insert_rows(target_model, batch_data, defaults or {})
+
+        # One formatted column at a time, then joined back into lines
+        text_columns = [list(map(_copy_text, column)) for column in zip(*rows)]
+        data = io.StringIO('\n'.join(map('\t'.join, zip(*text_columns))) + '\n')
+
+        query = SQL(
+            "COPY %s (%s) FROM STDIN",
+            SQL.identifier(target_model._table),
+            SQL(", ").join(SQL.identifier(name) for name in columns),
+        ).code
+        self.env.cr._obj.copy_expert(query, data)
+        return len(batch_data)
+
+    def _match_existing_records(self, target_model, batch_data, mapping):
+        """Find the target records matching a batch, with a single search
+
+        :return: tuple (keys, existing) where keys holds the match key of
+                 each row of the batch and existing maps a key to its record
+        """
+        match_fields = mapping.match_field_ids.mapped('name')
+
+        keys = [tuple(vals.get(f) for f in match_fields) for vals in batch_data]
+        # Each field within the batch's values; exact tuples are matched below
+        domain = [(f, 'in', list({key[i] for key in keys})) for i, f in enumerate(match_fields)]
+
+        existing = {}
+        for record in target_model.search_fetch(domain, match_fields):
+            key = tuple(
+                record[f].id if isinstance(record[f], models.BaseModel) else record[f]
+                for f in match_fields
+            )
+            existing.setdefault(key, record)
+        return keys, existing
+
+    def _update_records(self, target_model, batch_data, mapping):
+        """Update the existing records matching the batch, rows without match are skipped
+
+        :return: number of updated records
+        """
+        keys, existing = self._match_existing_records(target_model, batch_data, mapping)
+
+        updated = 0
+        for key, vals in zip(keys, batch_data):
+            record = existing.get(key)
+            if record:
+                # Written to the cache, the ORM flushes the batch together
+                record.write(vals)
+                updated += 1
+
+        skipped = len(batch_data) - updated
+        if skipped:
+            self._log(f'{skipped} records without match were not updated', 'warning')
+        return updated
+
+    def _create_or_update_records(self, target_model, batch_data, mapping):
+        """Update the existing records matching the batch and create the others at once
+
+        :return: number of created or updated records
+        """
+        keys, existing = self._match_existing_records(target_model, batch_data, mapping)
+
+        to_create = {}
+        for key, vals in zip(keys, batch_data):
+            record = existing.get(key)
+            if record:
+                record.write(vals)
+            elif key in to_create:
+                # Same key twice in the batch: the last values win
+                to_create[key].update(vals)
+            else:
+                to_create[key] = vals
+
+        if to_create:
+            target_model.create(list(to_create.values()))
+        return len(batch_data)
 
     def action_cancel(self):
-        """Cancel the import job"""
+        """Cancel the import job, before a worker picks it up"""
         self.ensure_one()
-        if self.state == 'running':
-            self.write({
-                'state': 'cancelled',
-                'end_date': fields.Datetime.now()
-            })
-            self._log('Job cancelled by user', 'warning')
+        if self.state != 'queued':
+            # A running import commits its batches and state on its own cursor
+            raise UserError(_('Only queued jobs can be cancelled'))
+        self.write({
+            'state': 'cancelled',
+            'end_date': fields.Datetime.now()
+        })
+        self._log('Job cancelled by user', 'warning')
 
     def action_retry(self):
         """Create a new job with same parameters"""
@@ -680,7 +1524,6 @@ class SqlImportJob(models.Model):
             'imported_records': 0,
             'failed_records': 0,
             'total_records': 0,
-            'log_entries': False,
             'error_message': False
         })
 
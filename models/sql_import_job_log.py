@@ -0,0 +1,22 @@
+from odoo import models, fields, api
+
+
+class SqlImportJobLog(models.Model):
+    _name = 'dat.sql.import.job.log'
+    _description = 'SQL Import Job Log Line'
+    _order = 'id'
+
+    job_id = fields.Many2one('dat.sql.import.job', string='Job', required=True, index=True, ondelete='cascade')
+    log_date = fields.Datetime(string='Date', required=True, default=fields.Datetime.now)
+    level = fields.Selection([
+        ('debug', 'Debug'),
+        ('info', 'Info'),
+        ('warning', 'Warning'),
+        ('error', 'Error')
+    ], string='Level', required=True, default='info')
+    message = fields.Text(string='Message')
+
+    def _format_line(self):
+        """Log line as displayed in the job's Import Log"""
+        self.ensure_one()
+        return f"[{self.log_date.strftime('%Y-%m-%d %H:%M:%S')}] [{self.level.upper()}] {self.message}"
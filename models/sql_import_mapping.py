@@ -1,10 +1,65 @@
-from odoo import models, fields, api, _
+from odoo import models, fields, api, tools, _
 from odoo.exceptions import UserError
 import json
 import logging
+import re
+
+from .sql_import_connection import Column, _quote_identifier
 
 _logger = logging.getLogger(__name__)
 
+# SQL Server regular identifier: a letter or _ first, then letters, digits, @, $, # or _
+_IDENTIFIER_RE = re.compile(r'[^\W\d][\w@$#]{0,127}\Z')
+
+# What a WHERE clause has no business containing: statement separators,
+# comments, data/schema changing keywords and server-side execution
+_STRING_LITERAL_RE = re.compile(r"N?'(?:[^']|'')*'")
+_FORBIDDEN_FILTER_RE = re.compile(
+    r";|--|/\*|\b(?:insert|update|delete|merge|drop|alter|create|truncate|exec|execute|"
+    r"grant|revoke|deny|union|into|waitfor|shutdown|openrowset|openquery|opendatasource|"
+    r"xp_\w*|sp_\w*)\b",
+    re.IGNORECASE,
+)
+
+
+def _check_identifier(name, label):
+    """Raise a UserError when ``name`` is not a regular SQL Server identifier"""
+    if not name or not _IDENTIFIER_RE.match(name):
+        raise UserError(_('Invalid %s name: %s') % (label, name))
+
+
+def _check_source_filter(source_filter):
+    """Raise a UserError when the WHERE clause contains more than a condition"""
+    # Quoted values may contain anything
+    match = _FORBIDDEN_FILTER_RE.search(_STRING_LITERAL_RE.sub("''", source_filter))
+    if match:
+        raise UserError(_('WHERE clause may not contain "%s"') % match.group())
+
+
+# Transforms a field mapping can use, see TRANSFORMS in sql_import_job
+_TRANSFORM_NAMES = ('direct', 'bool', 'int', 'float', 'str', 'date', 'datetime')
+_VALID_TRANSFORMS = frozenset(_TRANSFORM_NAMES)
+
+# Transform proposed by generate_default_mapping() for a source column type,
+# then for the type of the matching target field
+_SQL_TYPE_TO_TRANSFORM = {
+    'bit': 'bool',
+    **dict.fromkeys(('int', 'bigint', 'smallint', 'tinyint'), 'int'),
+    **dict.fromkeys(('float', 'real', 'decimal', 'numeric', 'money'), 'float'),
+    **dict.fromkeys(('varchar', 'nvarchar', 'char', 'nchar', 'text'), 'str'),
+    **dict.fromkeys(('datetime', 'datetime2', 'smalldatetime'), 'datetime'),
+    'date': 'date',
+}
+_ODOO_TYPE_TO_TRANSFORM = {
+    'boolean': 'bool',
+    'integer': 'int',
+    'float': 'float',
+    'char': 'str',
+    'text': 'str',
+    'date': 'date',
+    'datetime': 'datetime',
+}
+
 
 class SqlImportMapping(models.Model):
     _name = 'dat.sql.import.mapping'
@@ -26,15 +81,70 @@ class SqlImportMapping(models.Model):
         ('update', 'Update Existing Records'),
         ('create_update', 'Create or Update')
     ], string='Import Mode', default='create', required=True)
+    insert_method = fields.Selection([
+        ('orm', 'ORM'),
+        ('sql', 'Direct SQL'),
+        ('copy', 'PostgreSQL COPY')
+    ], string='Insert Method', default='orm', required=True,
+        help='Direct SQL and COPY insert each batch in bulk, bypassing the ORM. '
+             'Models with stored computed fields always use the ORM.')
+    insert_page_size = fields.Integer(string='Insert Page Size', default=500,
+                                      help='Rows per INSERT statement with the direct SQL insert method')
+    match_field_ids = fields.Many2many(
+        'ir.model.fields', string='Match Fields',
+        domain="[('model', '=', target_model), ('store', '=', True), "
+               "('ttype', 'in', ('char', 'integer', 'float', 'boolean', 'date', 'datetime', 'selection', 'many2one'))]",
+        help='Target fields identifying the existing record to update')
 
     # Field mappings
     field_mappings = fields.Text(string='Field Mappings', help='JSON field mapping configuration')
+    # Stored as jsonb: decoded by the database driver when read, and queryable
+    parsed_field_mappings = fields.Json(string='Parsed Field Mappings', compute='_compute_parsed_field_mappings',
+                                        store=True, help='Decoded field mappings, False when not valid JSON')
+    source_fields_sql = fields.Char(string='Source Fields SQL', compute='_compute_source_fields_sql', store=True,
+                                    help='Quoted select list of the mapped source columns')
 
     # Options
-    batch_size = fields.Integer(string='Batch Size', default=100)
+    batch_size = fields.Integer(string='Batch Size', default=100,
+                                help='Rows fetched from SQL Server per round-trip and created in Odoo per batch')
+    adaptive_batch_size = fields.Boolean(string='Adaptive Batch Size', default=False,
+                                         help='Tune the batch size during the import from the measured throughput '
+                                              'and keep the result as the new batch size')
+    fetch_size = fields.Integer(string='Fetch Size', default=5000,
+                                help='Rows read from SQL Server per fetch by the verification, '
+                                     'independently of the import batch size')
+    commit_every = fields.Integer(string='Commit Every', default=10,
+                                  help='Number of batches imported between two database commits')
+    source_page_size = fields.Integer(string='Source Page Size', default=0,
+                                      help='Read the source in pages of this many rows, ordered on the first mapped '
+                                           'column, instead of a single query. The column must be a unique, not null key, '
+                                           'checked when the import starts. 0 disables paging')
+    parallel_workers = fields.Integer(string='Parallel Workers', default=1,
+                                      help='Import ranges of the first mapped (integer key) column in parallel')
+    compute_total = fields.Boolean(string='Compute Total', default=False,
+                                   help='Count the source records before importing to display a progress percentage')
     skip_errors = fields.Boolean(string='Skip Errors', help='Continue import even if some records fail')
     active = fields.Boolean(default=True)
 
+    @api.depends('field_mappings')
+    def _compute_parsed_field_mappings(self):
+        for mapping in self:
+            try:
+                mapping.parsed_field_mappings = json.loads(mapping.field_mappings or '[]')
+            except ValueError:
+                mapping.parsed_field_mappings = False
+
+    @api.depends('parsed_field_mappings')
+    def _compute_source_fields_sql(self):
+        for mapping in self:
+            mappings = mapping.parsed_field_mappings
+            if isinstance(mappings, list) and all(
+                    isinstance(m, dict) and isinstance(m.get('source_field'), str) for m in mappings):
+                mapping.source_fields_sql = ', '.join(_quote_identifier(m['source_field']) for m in mappings)
+            else:
+                # Not queryable, validate_mapping tells why
+                mapping.source_fields_sql = False
+
     @api.model_create_multi
     def create(self, vals_list):
         """Override create to handle batch operations and initialize field mappings"""
@@ -46,78 +156,116 @@ class SqlImportMapping(models.Model):
 
         return super().create(vals_list)
 
-    def fetch_source_columns(self):
+    def _get_source_columns(self):
+        """Columns of the source table
+
+        Read from the source table record when its columns were stored by the
+        last refresh of the tables, see _get_table_columns() otherwise.
+        """
         self.ensure_one()
 
         if not self.connection_ids or not self.source_table_id:
             raise UserError(_('Connection and source table must be configured first'))
 
-        columns = []
-
+        table = self.source_table_id
+        if table.columns_json:
+            return tuple(Column(*column) for column in table.columns_json)
         try:
-            with self.source_table_id.connection_ids.get_connection() as conn:
-                cursor = conn.cursor()
-                cursor.execute("""
-                               SELECT COLUMN_NAME, DATA_TYPE, IS_NULLABLE, CHARACTER_MAXIMUM_LENGTH
-                               FROM INFORMATION_SCHEMA.COLUMNS
-                               WHERE TABLE_SCHEMA = %s
-                                 AND TABLE_NAME = %s
-                               ORDER BY ORDINAL_POSITION
-                               """, (self.source_schema, self.source_table_id))
-
-                for row in cursor.fetchall():
-                    columns.append({
-                        'name': row[0],
-                        'type': row[1],
-                        'nullable': row[2] == 'YES',
-                        'length': row[3]
-                    })
-
-            return {
-                'type': 'ir.actions.client',
-                'tag': 'display_notification',
-                'params': {
-                    'title': _('Source Columns Fetched'),
-                    'message': _('Found %d columns in table %s.%s') % (len(columns), self.source_schema,
-                                                                       self.source_table_id),
-                    'type': 'success',
-                }
-            }
+            columns = self.connection_ids._get_table_columns(table.schema_name, table.table_name)
+        except UserError:
+            raise
         except Exception as e:
             raise UserError(_('Failed to fetch source columns: %s') % str(e))
+        table.columns_json = [list(column) for column in columns]
+        return columns
 
-    def fetch_target_fields(self):
-        """Fetch fields from target Odoo model"""
+    def fetch_source_columns(self):
+        self.ensure_one()
+
+        columns = self._get_source_columns()
+
+        return {
+            'type': 'ir.actions.client',
+            'tag': 'display_notification',
+            'params': {
+                'title': _('Source Columns Fetched'),
+                'message': _('Found %d columns in table %s') % (len(columns), self.source_table_id.full_name),
+                'type': 'success',
+            }
+        }
+
+    def action_refresh_columns(self):
+        """Fetch the source columns again instead of using the cached ones"""
+        self.ensure_one()
+        self.env.registry.clear_cache()
+        self.source_table_id.columns_json = False
+        return self.fetch_source_columns()
+
+    @api.model
+    @tools.ormcache('model_name')
+    def _get_storable_fields(self, model_name):
+        """Stored, non computed fields of a model, as a tuple of dicts
+
+        Cached per model until the registry is reloaded.
+        """
+        try:
+            model = self.env[model_name]
+        except KeyError:
+            raise UserError(_('Model %s not found') % model_name)
+
+        return tuple({
+            'name': fname,
+            'type': field.type,
+            'string': field.string,
+            'required': field.required,
+            'readonly': field.readonly
+        } for fname, field in model._fields.items()
+            if not field.compute and field.store and fname not in ['__last_update', 'display_name'])
+
+    def _get_target_model(self):
+        """Model of the target records, looked up once per call site"""
+        self.ensure_one()
+        try:
+            return self.env[self.target_model]
+        except KeyError:
+            raise UserError(_('Target model %s does not exist') % self.target_model)
+
+    def _get_target_fields(self):
+        """Stored, non computed fields of the target model, as dicts"""
         self.ensure_one()
 
         if not self.target_model:
             raise UserError(_('Target model must be configured first'))
 
-        fields_list = []
+        return [dict(target_field) for target_field in self._get_storable_fields(self.target_model)]
 
-        try:
-            model = self.env[self.target_model]
-            for fname, field in model._fields.items():
-                if not field.compute and field.store and fname not in ['__last_update', 'display_name']:
-                    fields_list.append({
-                        'name': fname,
-                        'type': field.type,
-                        'string': field.string,
-                        'required': field.required,
-                        'readonly': field.readonly
-                    })
-
-            return {
-                'type': 'ir.actions.client',
-                'tag': 'display_notification',
-                'params': {
-                    'title': _('Target Fields Fetched'),
-                    'message': _('Found %d fields in model %s') % (len(fields_list), self.target_model),
-                    'type': 'success',
-                }
+    def fetch_target_fields(self):
+        """Fetch fields from target Odoo model"""
+        self.ensure_one()
+
+        fields_list = self._get_target_fields()
+
+        return {
+            'type': 'ir.actions.client',
+            'tag': 'display_notification',
+            'params': {
+                'title': _('Target Fields Fetched'),
+                'message': _('Found %d fields in model %s') % (len(fields_list), self.target_model),
+                'type': 'success',
             }
-        except KeyError:
-            raise UserError(_('Model %s not found') % self.target_model)
+        }
+
+    @api.model
+    @tools.ormcache('model_name')
+    def _get_target_field_index(self, model_name):
+        """{lower case name: (name, type)} of the fields _get_storable_fields() returns
+
+        Cached per model until the registry is reloaded.
+        """
+        return {
+            target_field['name'].lower(): (target_field['name'], target_field['type'])
+            for target_field in self._get_storable_fields(model_name)
+        }
 
     def generate_default_mapping(self):
         """Auto-generate field mappings based on field names"""
@@ -126,88 +274,31 @@ class SqlImportMapping(models.Model):
         if not self.connection_ids or not self.source_table_id or not self.target_model:
             raise UserError(_('Connection, source table, and target model must be configured first'))
 
-        # Get source columns
-        source_columns = []
-        try:
-            with self.connection_ids.get_connection() as conn:
-                cursor = conn.cursor()
-                cursor.execute("""
-                               SELECT COLUMN_NAME, DATA_TYPE
-                               FROM INFORMATION_SCHEMA.COLUMNS
-                               WHERE TABLE_SCHEMA = %s
-                                 AND TABLE_NAME = %s
-                               ORDER BY ORDINAL_POSITION
-                               """, (self.source_schema, self.source_table_id))
-
-                for row in cursor.fetchall():
-                    source_columns.append({
-                        'name': row.COLUMN_NAME,
-                        'type': row.DATA_TYPE
-                    })
-        except Exception as e:
-            raise UserError(_('Failed to fetch source columns: %s') % str(e))
-
-        # Get target fields
-        target_fields = []
-        try:
-            model = self.env[self.target_model]
-            for fname, field in model._fields.items():
-                if not field.compute and field.store and fname not in ['__last_update', 'display_name']:
-                    target_fields.append({
-                        'name': fname,
-                        'type': field.type
-                    })
-        except KeyError:
-            raise UserError(_('Model %s not found') % self.target_model)
+        # Source columns and target fields, both cached
+        source_columns = self._get_source_columns()
 
         # Generate mappings
         mappings = []
-        target_field_names = {f['name'].lower(): f for f in target_fields}
+        target_field_index = self._get_target_field_index(self.target_model)
 
         for col in source_columns:
-            source_name = col['name'].lower()
-            transform = 'direct'
-
+            source_name = col.name.lower()
             # Determine appropriate transform based on data type
-            if col['type'] in ['bit']:
-                transform = 'bool'
-            elif col['type'] in ['int', 'bigint', 'smallint', 'tinyint']:
-                transform = 'int'
-            elif col['type'] in ['float', 'real', 'decimal', 'numeric', 'money']:
-                transform = 'float'
-            elif col['type'] in ['varchar', 'nvarchar', 'char', 'nchar', 'text']:
-                transform = 'str'
-            elif col['type'] in ['datetime', 'datetime2', 'smalldatetime']:
-                transform = 'datetime'
-            elif col['type'] in ['date']:
-                transform = 'date'
+            transform = _SQL_TYPE_TO_TRANSFORM.get(col.type, 'direct')
 
             # Try exact match
-            if source_name in target_field_names:
-                target_field = target_field_names[source_name]
+            target_field = target_field_index.get(source_name)
+            if target_field:
                 # Adjust transform based on target field type
-                if target_field['type'] == 'boolean':
-                    transform = 'bool'
-                elif target_field['type'] in ['integer', 'float']:
-                    transform = target_field['type'][:3]  # 'int' or 'flo'
-                elif target_field['type'] in ['char', 'text']:
-                    transform = 'str'
-                elif target_field['type'] == 'date':
-                    transform = 'date'
-                elif target_field['type'] == 'datetime':
-                    transform = 'datetime'
+                transform = _ODOO_TYPE_TO_TRANSFORM.get(target_field[1], transform)
+            elif '_' in source_name:
+                # Try common variations, a name without underscores already missed
+                target_field = target_field_index.get(source_name.replace('_', ''))
 
+            if target_field:
                 mappings.append({
-                    'source_field': col['name'],
-                    'target_field': target_field['name'],
-                    'transform': transform
-                })
-            # Try common variations
-            elif source_name.replace('_', '') in target_field_names:
-                target_field = target_field_names[source_name.replace('_', '')]
-                mappings.append({
-                    'source_field': col['name'],
-                    'target_field': target_field['name'],
+                    'source_field': col.name,
+                    'target_field': target_field[0],
                     'transform': transform
                 })
 
@@ -230,22 +321,23 @@ class SqlImportMapping(models.Model):
         if not self.field_mappings:
             raise UserError(_('Field mappings are required'))
 
-        try:
-            mappings = json.loads(self.field_mappings)
-        except json.JSONDecodeError:
-            raise UserError(_('Invalid JSON in field mappings'))
-
+        mappings = self.parsed_field_mappings
         if not mappings:
+            # Tell invalid JSON from an empty configuration
+            try:
+                json.loads(self.field_mappings)
+            except json.JSONDecodeError:
+                raise UserError(_('Invalid JSON in field mappings'))
             raise UserError(_('No field mappings configured'))
 
-        # Validate target model exists
-        try:
-            model = self.env[self.target_model]
-        except KeyError:
-            raise UserError(_('Target model %s does not exist') % self.target_model)
+        # Validate what ends up in the source queries
+        _check_identifier(self.source_table_id.schema_name, _('schema'))
+        _check_identifier(self.source_table_id.table_name, _('table'))
+        if self.source_filter:
+            _check_source_filter(self.source_filter)
 
         # Validate each mapping
-        model_fields = model._fields
+        model_fields = self._get_target_model()._fields
         for i, mapping in enumerate(mappings):
             if not isinstance(mapping, dict):
                 raise UserError(_('Mapping %d is not a valid object') % (i + 1))
@@ -256,20 +348,55 @@ class SqlImportMapping(models.Model):
             if 'target_field' not in mapping:
                 raise UserError(_('Missing target_field in mapping %d') % (i + 1))
 
+            _check_identifier(mapping['source_field'], _('source field'))
+
             target_field = mapping['target_field']
             if target_field not in model_fields:
                 raise UserError(_('Target field %s does not exist in model %s') % (target_field, self.target_model))
 
             # Validate transform
             transform = mapping.get('transform', 'direct')
-            valid_transforms = ['direct', 'bool', 'int', 'float', 'str', 'date', 'datetime']
-            if transform not in valid_transforms:
-                raise UserError(_('Invalid transform "%s" in mapping %d. Valid transforms: %s') % (transform, i + 1,
-                                                                                                   ', '.join(
-                                                                                                       valid_transforms)))
+            if transform not in _VALID_TRANSFORMS:
+                raise UserError(_('Invalid transform "%s" in mapping %d. Valid transforms: %s') % (
+                    transform, i + 1, ', '.join(_TRANSFORM_NAMES)))
+
+        # Updating needs a key to find the existing records
+        if self.target_mode != 'create':
+            if not self.match_field_ids:
+                raise UserError(_('Match fields are required to update existing records'))
+            mapped_fields = {m['target_field'] for m in mappings}
+            unmapped = [f for f in self.match_field_ids.mapped('name') if f not in mapped_fields]
+            if unmapped:
+                raise UserError(_('Match fields must be mapped: %s') % ', '.join(unmapped))
 
         return True
 
+    def _source_from_clause(self, where=None, sample_percent=None, seed=0):
+        """Canonical FROM/WHERE clause for the source table
+
+        Built on a single line with quoted identifiers, so repeated runs of
+        the same mapping send byte-identical statements and SQL Server can
+        reuse the cached plan.
+
+        :param where: extra SQL condition, combined with the source filter
+        :param sample_percent: only read this percentage of the table pages
+        :param seed: REPEATABLE seed of the sample, the same seed reads the same pages
+        """
+        table = self.source_table_id
+        clause = f"FROM {_quote_identifier(table.schema_name)}.{_quote_identifier(table.table_name)}"
+        if sample_percent:
+            clause += f" TABLESAMPLE ({float(sample_percent):g} PERCENT) REPEATABLE ({int(seed)})"
+        conditions = [f"({self.source_filter.strip()})"] if self.source_filter else []
+        if where:
+            conditions.append(where)
+        if conditions:
+            clause += f" WHERE {' AND '.join(conditions)}"
+        return clause
+
+    def _source_sample_query(self, limit):
+        """SELECT of the first ``limit`` source rows of the mapped columns"""
+        return f"SELECT TOP ({int(limit)}) {self.source_fields_sql} {self._source_from_clause()}"
+
     def action_test_mapping(self):
         """Test the mapping configuration with a small sample"""
         self.ensure_one()
@@ -281,21 +408,13 @@ class SqlImportMapping(models.Model):
         try:
             with self.connection_ids.get_connection() as conn:
                 cursor = conn.cursor()
-                mappings = json.loads(self.field_mappings)
-
-                # Properly quote field names with square brackets for SQL Server
-                quoted_fields = [f'[{m["source_field"]}]' for m in mappings]
-                quoted_table = f'[{self.source_schema}].[{self.source_table_id.table_name}]'
-
-                test_query = f"""
-                    SELECT TOP 5 {', '.join(quoted_fields)}
-                    FROM {quoted_table}
-                    {f'WHERE {self.source_filter}' if self.source_filter else ''}
-                """
+                # The sample comes back in a single fetch
+                cursor.arraysize = 5
+                test_query = self._source_sample_query(cursor.arraysize)
 
-                _logger.debug(f"Executing test query: {test_query}")
+                _logger.debug("Executing test query: %s", test_query)
                 cursor.execute(test_query)
-                rows = cursor.fetchall()
+                rows = cursor.fetchmany()
 
                 return {
                     'type': 'ir.actions.client',
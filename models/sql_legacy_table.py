@@ -1,6 +1,6 @@
 from odoo import models, fields, api, _
 from odoo.exceptions import UserError
-from .password_mixin import PasswordMixin
+from odoo.tools import SQL
 import logging
 
 _logger = logging.getLogger(__name__)
@@ -14,15 +14,49 @@ class SqlLegacyTable(models.Model):
     connection_id = fields.Many2one('dat.sql.import.connection', string='Connection', required=True)
     schema_name = fields.Char(string='Schema', required=True)
     table_name = fields.Char(string='Table')
-    full_name = fields.Char(string='Full Name', compute='_compute_full_name', store=True)
-
-    @api.depends('schema_name', 'table_name')
-    def _compute_full_name(self):
-        for record in self:
-            if record.schema_name and record.table_name:
-                record.full_name = f"{record.schema_name}.{record.table_name}"
-            else:
-                record.full_name = ""
+    # Generated by PostgreSQL, see init()
+    full_name = fields.Char(string='Full Name', readonly=True, copy=False)
+    columns_json = fields.Json(string='Columns', readonly=True,
+                               help='[name, type, nullable, length] of the source columns, '
+                                    'as of the last refresh of the tables')
+
+    def init(self):
+        """Turn full_name into a generated column
+
+        PostgreSQL fills it on every INSERT and UPDATE, instead of a compute
+        method running for each table the refresh creates.
+        """
+        cr = self.env.cr
+        cr.execute("""
+            SELECT attgenerated FROM pg_attribute
+             WHERE attrelid = %s::regclass AND attname = 'full_name'
+        """, [self._table])
+        row = cr.fetchone()
+        if row and row[0] == 's':
+            return
+        cr.execute(SQL("ALTER TABLE %s DROP COLUMN IF EXISTS full_name", SQL.identifier(self._table)))
+        cr.execute(SQL("""
+            ALTER TABLE %s ADD COLUMN full_name varchar GENERATED ALWAYS AS (
+                CASE WHEN schema_name <> '' AND table_name <> ''
+                     THEN schema_name || '.' || table_name ELSE '' END
+            ) STORED
+        """, SQL.identifier(self._table)))
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        records = super().create(vals_list)
+        # The ORM cached full_name as empty, PostgreSQL filled it on INSERT
+        records.flush_recordset()
+        records.invalidate_recordset(['full_name', 'display_name'])
+        return records
+
+    def write(self, vals):
+        res = super().write(vals)
+        if 'schema_name' in vals or 'table_name' in vals:
+            # The ORM does not know PostgreSQL changed the generated column
+            self.flush_recordset(['schema_name', 'table_name'])
+            self.invalidate_recordset(['full_name', 'display_name'])
+        return res
 
     @api.model
     def refresh_tables_for_connection(self, connection_id):
@@ -35,21 +69,28 @@ class SqlLegacyTable(models.Model):
         # Fetch and create new tables
         try:
             tables = connection._fetch_tables_list()
-            table_vals = []
-            for table in tables:
-
-                existing_table = self.search([
-                    ('connection_id', '=', connection_id),
-                    ('schema_name', '=', table['schema']),
-                    ('table_name', '=', table['table'])
-                ])
-
-                if not existing_table:
-                    table_vals.append({
-                        'connection_id': connection_id,
-                        'schema_name': table['schema'],
-                        'table_name': table['table'],
-                    })
+            # The cached column lists may be outdated as well
+            self.env.registry.clear_cache()
+            # The columns of all the tables, in one query instead of one per table
+            columns = {key: [list(column) for column in table_columns]
+                       for key, table_columns in connection._fetch_columns_by_table().items()}
+
+            # The tables already known, in one query as well
+            existing = {
+                (record['schema_name'], record['table_name']): record
+                for record in self.search_read([('connection_id', '=', connection_id)],
+                                               ['schema_name', 'table_name', 'columns_json'])
+            }
+            for key, record in existing.items():
+                if key in columns and record['columns_json'] != columns[key]:
+                    self.browse(record['id']).columns_json = columns[key]
+
+            table_vals = [{
+                'connection_id': connection_id,
+                'schema_name': table.schema,
+                'table_name': table.table,
+                'columns_json': columns.get((table.schema, table.table), []),
+            } for table in tables if (table.schema, table.table) not in existing]
 
             if table_vals:
                 self.create(table_vals)
@@ -1,6 +1,5 @@
 from odoo import models, fields, api, _
 from odoo.exceptions import UserError
-import json
 
 
 class SqlImportWizard(models.TransientModel):
@@ -34,22 +33,18 @@ class SqlImportWizard(models.TransientModel):
         # Validate mapping first
         mapping.validate_mapping()
 
-        field_mappings = json.loads(mapping.field_mappings or '[]')
+        field_mappings = mapping.parsed_field_mappings or []
 
         if not field_mappings:
             raise UserError(_('No field mappings defined'))
 
         preview_lines = []
-        with mapping.connection_id.get_connection() as conn:
+        with mapping.connection_ids.get_connection() as conn:
             cursor = conn.cursor()
 
-            # Build preview query
-            source_fields = [m['source_field'] for m in field_mappings]
-            preview_query = f"""
-                SELECT TOP {self.preview_count} {', '.join(source_fields)}
-                FROM {mapping.source_schema}.{mapping.source_table}
-                {f'WHERE {mapping.source_filter}' if mapping.source_filter else ''}
-            """
+            # Build preview query, its rows come back in a single fetch
+            cursor.arraysize = max(self.preview_count, 1)
+            preview_query = mapping._source_sample_query(cursor.arraysize)
 
             cursor.execute(preview_query)
             columns = [column[0] for column in cursor.description]
@@ -62,11 +57,10 @@ class SqlImportWizard(models.TransientModel):
             preview_lines.append("\nSample Data:")
             preview_lines.append("-" * 80)
 
-            for row in cursor.fetchall():
-                row_data = []
-                for i, value in enumerate(row):
-                    row_data.append(f"{columns[i]}: {value}")
-                preview_lines.append(" | ".join(row_data))
+            preview_lines.extend(
+                " | ".join(f"{column}: {value}" for column, value in zip(columns, row))
+                for row in cursor.fetchmany()
+            )
 
         self.preview_data = "\n".join(preview_lines)
 